@@ -0,0 +1,302 @@
+import argparse
+import itertools
+import os
+import time
+import tracemalloc
+
+from generator import generate_puzzle
+from logic import *
+from parallel import parallel_model_check
+import puzzle
+from sat import KnowledgeBase, sat_entails
+from simplify import node_count, simplify
+
+SIZES = [3, 5, 8, 10, 12, 50, 100]
+SEEDS = 2
+DEPTH = 2
+DEPTHS = [6, 10, 14]
+INCREMENTAL_SIZES = [50, 150]
+PARALLEL_SIZES = [10, 11]
+SIMPLIFY_SIZES = [3, 5, 6, 50]
+PROCESS_COUNTS = sorted({1, 2, 4, os.cpu_count() or 1})
+
+# engines asked one query at a time, with the most symbols each is timed on
+ENGINES = [
+    ("model_check", model_check, 16),
+    ("fast_model_check", fast_model_check, 20),
+    ("truth_table_check", truth_table_check, 24),
+    ("parallel_model_check", parallel_model_check, 16),
+    ("sat_entails", sat_entails, float("inf")),
+]
+
+
+def entails_all_uncached(knowledge, queries):
+    cached_models.pop(knowledge, None)
+    return entails_all(knowledge, queries)
+
+
+def knowledge_base_entails_all(knowledge, queries):
+    kb = KnowledgeBase(knowledge)
+    return [kb.entails(query) for query in queries]
+
+
+# engines asked every query at once
+BATCH_ENGINES = [
+    ("entails_all", entails_all_uncached, 24),
+    ("entails_all cached", entails_all, 24),
+    ("KnowledgeBase", knowledge_base_entails_all, float("inf")),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time every inference engine and check they agree."
+    )
+    parser.add_argument("sizes", nargs="*", type=int, default=SIZES,
+                        help="characters in each generated puzzle")
+    parser.add_argument("--seeds", type=int, default=SEEDS,
+                        help="puzzles generated per size")
+    parser.add_argument("--depth", type=int, default=DEPTH,
+                        help="nesting depth of generated statements")
+    parser.add_argument("--puzzles-only", action="store_true",
+                        help="skip the incremental, parallel and deep reports")
+    args = parser.parse_args()
+
+    print("puzzle.py")
+    for name, knowledge in [
+        ("Puzzle 0", puzzle.knowledge0),
+        ("Puzzle 1", puzzle.knowledge1),
+        ("Puzzle 2", puzzle.knowledge2),
+        ("Puzzle 3", puzzle.knowledge3),
+    ]:
+        queries = [puzzle.AKnight, puzzle.AKnave, puzzle.BKnight,
+                   puzzle.BKnave, puzzle.CKnight, puzzle.CKnave]
+        report(name, knowledge, queries)
+
+    print("Generated puzzles")
+    for n in args.sizes:
+        for seed in range(args.seeds):
+            knowledge, queries, solution = generate_puzzle(n, seed, args.depth)
+            answers = report(f"{n} characters, seed {seed}", knowledge, queries)
+
+            # whatever is entailed must hold in the hidden solution
+            for query, entailed in zip(queries, answers):
+                if entailed and not query.evaluate(solution):
+                    raise AssertionError(f"{query} entailed but not true")
+
+    if args.puzzles_only:
+        return
+
+    print("Simplification")
+    for name, knowledge, queries in simplification_puzzles(args.seeds, args.depth):
+        simplification_report(name, knowledge, queries)
+
+    print("Incremental puzzle building")
+    for n in INCREMENTAL_SIZES:
+        incremental_report(n)
+
+    print("Parallel model checking")
+    for n in PARALLEL_SIZES:
+        parallel_report(n)
+
+    print("Deep knowledge bases")
+    for depth in DEPTHS:
+        interning_report(depth)
+
+
+def simplification_puzzles(seeds, depth):
+    """Yields the name, knowledge base and queries of each puzzle in
+    puzzle.py, then of generated puzzles of each of SIMPLIFY_SIZES."""
+    queries = [puzzle.AKnight, puzzle.AKnave, puzzle.BKnight,
+               puzzle.BKnave, puzzle.CKnight, puzzle.CKnave]
+    for i in range(4):
+        yield f"Puzzle {i}", getattr(puzzle, f"knowledge{i}"), queries
+    for n in SIMPLIFY_SIZES:
+        for seed in range(seeds):
+            knowledge, queries, _ = generate_puzzle(n, seed, depth)
+            yield f"{n} characters, seed {seed}", knowledge, queries
+
+
+def simplification_report(name, knowledge, queries):
+    """Prints the node counts of a knowledge base before and after
+    simplification, and the time to evaluate each in every model (or, for
+    larger puzzles, to answer every query with `sat_entails`)."""
+    start = time.perf_counter()
+    simplified = simplify(knowledge)
+    seconds = time.perf_counter() - start
+
+    names = sorted(knowledge.symbols())
+    if len(names) <= 12:
+        measure = "evaluate in every model"
+        models = [dict(zip(names, values))
+                  for values in itertools.product([False, True],
+                                                  repeat=len(names))]
+        engine = lambda sentence: [sentence.evaluate(m) for m in models]
+    else:
+        measure = "sat_entails"
+        engine = lambda sentence: [sat_entails(sentence, query)
+                                   for query in queries]
+
+    times = []
+    answers = []
+    for sentence in (knowledge, simplified):
+        start = time.perf_counter()
+        answers.append(engine(sentence))
+        times.append(time.perf_counter() - start)
+    if answers[0] != answers[1]:
+        raise AssertionError(f"{name}: simplified knowledge disagrees")
+    print(f"    {name}: {node_count(knowledge)} -> {node_count(simplified)} "
+          f"nodes in {seconds:.4f}s, {measure} {times[0]:.4f}s -> "
+          f"{times[1]:.4f}s ({times[0] / times[1]:.1f}x)")
+
+
+def chain_puzzle(n):
+    """Returns the knowledge base and query symbols for a puzzle where each
+    of `n` characters says "The next one of us is a knave.", and the last
+    says "The first one of us is a knight." """
+    knights = [Symbol(f"{i} is a Knight") for i in range(n)]
+    knaves = [Symbol(f"{i} is a Knave") for i in range(n)]
+    conjuncts = []
+    for i in range(n):
+        says = knaves[i + 1] if i < n - 1 else knights[0]
+        conjuncts.append(Or(knights[i], knaves[i]))
+        conjuncts.append(Not(And(knights[i], knaves[i])))
+        conjuncts.append(Implication(knights[i], says))
+        conjuncts.append(Implication(knaves[i], Not(says)))
+    return And(*conjuncts), knights + knaves
+
+
+def incremental_report(n):
+    """Prints the time to build a chain puzzle one sentence at a time,
+    asking after every sentence whether the first character is a knight,
+    both from scratch and with one incremental KnowledgeBase."""
+    knowledge, _ = chain_puzzle(n)
+    query = Symbol("0 is a Knight")
+
+    start = time.perf_counter()
+    expected = [sat_entails(And(*knowledge.conjuncts[:i + 1]), query)
+                for i in range(len(knowledge.conjuncts))]
+    scratch = time.perf_counter() - start
+
+    start = time.perf_counter()
+    kb = KnowledgeBase()
+    answers = []
+    for conjunct in knowledge.conjuncts:
+        kb.add(conjunct)
+        answers.append(kb.entails(query))
+    incremental = time.perf_counter() - start
+
+    if answers != expected:
+        raise AssertionError(f"{n} characters: KnowledgeBase disagrees")
+    print(f"    {n} characters, {len(answers)} queries: "
+          f"from scratch {scratch:.4f}s, incremental {incremental:.4f}s "
+          f"({scratch / incremental:.1f}x)")
+
+
+def parallel_report(n):
+    """Prints the speedup of `parallel_model_check` over one process for
+    each process count, on a chain puzzle of `n` characters and a query it
+    entails, so that every model has to be checked."""
+    knowledge, _ = chain_puzzle(n)
+    query = Or(Symbol("0 is a Knight"), Symbol("0 is a Knave"))
+    print(f"    {n} characters ({2 * n} symbols)")
+    baseline = None
+    for processes in PROCESS_COUNTS:
+        start = time.perf_counter()
+        if not parallel_model_check(knowledge, query, processes):
+            raise AssertionError(f"{n} characters: parallel_model_check wrong")
+        seconds = time.perf_counter() - start
+        baseline = baseline or seconds
+        print(f"        {processes} processes {seconds:.4f}s "
+              f"({baseline / seconds:.1f}x)")
+
+
+def nested_statement(knights, knaves, depth):
+    """Returns what character `depth` means by "I am a knight if and only
+    if the one before me is telling the truth.", built from scratch at
+    every level so identical subsentences are constructed repeatedly."""
+    if depth == 0:
+        return knights[0]
+    inner = nested_statement(knights, knaves, depth - 1)
+    return Or(
+        And(knights[depth], nested_statement(knights, knaves, depth - 1)),
+        And(knaves[depth], Not(inner)),
+    )
+
+
+def interning_report(depth):
+    """Prints the memory held by a deep knowledge base and the time taken
+    to walk it, its hash and its symbols."""
+    knights = [Symbol(f"{i} is a Knight") for i in range(depth + 1)]
+    knaves = [Symbol(f"{i} is a Knave") for i in range(depth + 1)]
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    knowledge = And(
+        Implication(knights[depth], nested_statement(knights, knaves, depth)),
+        Implication(knaves[depth],
+                    Not(nested_statement(knights, knaves, depth))),
+    )
+    build = time.perf_counter() - start
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        hash(knowledge)
+        knowledge.symbols()
+    lookup = time.perf_counter() - start
+    print(f"    depth {depth}: {nodes(knowledge)} distinct nodes, "
+          f"{memory / 1024:.1f} KiB, built in {build:.4f}s, "
+          f"1000 x hash + symbols in {lookup:.4f}s")
+
+
+def nodes(sentence, seen=None):
+    """Returns the number of distinct node objects in `sentence`."""
+    seen = set() if seen is None else seen
+    if id(sentence) in seen:
+        return 0
+    seen.add(id(sentence))
+    children = (sentence.conjuncts if isinstance(sentence, And)
+                else sentence.disjuncts if isinstance(sentence, Or)
+                else (sentence.operand,) if isinstance(sentence, Not)
+                else (sentence.antecedent, sentence.consequent)
+                if isinstance(sentence, Implication)
+                else (sentence.left, sentence.right)
+                if isinstance(sentence, Biconditional)
+                else ())
+    return 1 + sum(nodes(child, seen) for child in children)
+
+
+def report(name, knowledge, queries):
+    """Prints how long every engine that can handle the knowledge base
+    takes to answer all queries, and returns their answers, raising
+    AssertionError if any two engines disagree."""
+    symbol_count = len(knowledge.symbols())
+    print(f"    {name} ({symbol_count} symbols)")
+    expected = None
+    engines = [(engine_name, batch(engine), max_symbols)
+               for engine_name, engine, max_symbols in ENGINES]
+    for engine_name, engine, max_symbols in engines + BATCH_ENGINES:
+        if symbol_count > max_symbols:
+            continue
+        start = time.perf_counter()
+        answers = engine(knowledge, queries)
+        seconds = time.perf_counter() - start
+        if expected is None:
+            expected, baseline = answers, seconds
+        elif answers != expected:
+            raise AssertionError(f"{name}: {engine_name} disagrees")
+        print(f"        {engine_name:<20} {seconds:.4f}s "
+              f"({baseline / seconds:.1f}x)")
+    return expected
+
+
+def batch(engine):
+    """Returns a function asking `engine` each query in turn."""
+    return lambda knowledge, queries: [engine(knowledge, query)
+                                       for query in queries]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import random
+import string
+
+from logic import *
+
+
+def character_names(n):
+    """Returns `n` character names: A to Z, then A1 to Z1, and so on."""
+    letters = string.ascii_uppercase
+    return [letters[i % 26] + (str(i // 26) if i >= 26 else "")
+            for i in range(n)]
+
+
+def generate_puzzle(n, seed=0, depth=2):
+    """Returns a random knights-and-knaves puzzle with `n` characters, each
+    of whom makes one statement nested up to `depth` levels deep.
+
+    The puzzle is returned as `(knowledge, symbols, solution)`, where
+    `knowledge` is the puzzle's knowledge base, `symbols` lists every
+    "is a Knight" and "is a Knave" symbol, and `solution` maps each
+    symbol name to its value in a hidden assignment of roles that the
+    puzzle is guaranteed to be consistent with. The puzzle may have other
+    solutions too, in which case some roles are not entailed."""
+    rng = random.Random(seed)
+    names = character_names(n)
+    knights = [Symbol(f"{name} is a Knight") for name in names]
+    knaves = [Symbol(f"{name} is a Knave") for name in names]
+    is_knight = [rng.random() < 0.5 for _ in names]
+    solution = dict()
+    for knight, knave, role in zip(knights, knaves, is_knight):
+        solution[knight.name] = role
+        solution[knave.name] = not role
+
+    def statement(speaker, level):
+        """Returns a random statement about characters other than `speaker`
+        (or, rarely, the speaker themself)."""
+        other = rng.randrange(n)
+        if n > 1 and other == speaker and rng.random() < 0.8:
+            other = (other + rng.randrange(1, n)) % n
+        atom = rng.choice([knights, knaves])[other]
+        if level == 0 or rng.random() < 0.3:
+            return atom
+
+        kind = rng.randrange(6)
+        if kind == 0:
+            return Not(statement(speaker, level - 1))
+        if kind == 1:
+            return And(statement(speaker, level - 1),
+                       statement(speaker, level - 1))
+        if kind == 2:
+            return Or(statement(speaker, level - 1),
+                      statement(speaker, level - 1))
+        if kind == 3:
+            return Implication(statement(speaker, level - 1),
+                               statement(speaker, level - 1))
+        if kind == 4:
+            return Biconditional(statement(speaker, level - 1),
+                                 statement(speaker, level - 1))
+
+        # "X says ...": X is a knight if and only if what X says is true
+        return Biconditional(knights[other], statement(other, level - 1))
+
+    conjuncts = []
+    for i in range(n):
+        says = statement(i, depth)
+
+        # knights tell the truth and knaves lie in the hidden solution
+        if says.evaluate(solution) != is_knight[i]:
+            says = Not(says)
+
+        conjuncts.extend([
+            Or(knights[i], knaves[i]),
+            Not(And(knights[i], knaves[i])),
+            Implication(knights[i], says),
+            Implication(knaves[i], Not(says)),
+        ])
+
+    return And(*conjuncts), knights + knaves, solution
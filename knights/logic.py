@@ -1,7 +1,58 @@
 import itertools
+import weakref
 
 
 class Sentence():
+    """Base class for logical sentences.
+
+    Sentences are immutable and hash-consed: constructing a sentence that
+    is structurally equal to one that already exists returns the existing
+    object, so equal sentences are identical and each node caches its hash
+    and its set of symbols."""
+
+    __slots__ = ("_hash", "_symbols", "__weakref__")
+
+    # every live sentence, keyed on its kind and its children
+    interned = weakref.WeakValueDictionary()
+
+    @classmethod
+    def intern(cls, key, **fields):
+        """Returns the sentence of this class for `key`, creating it with the
+        given fields if no equal sentence exists."""
+        sentence = Sentence.interned.get(key)
+        if sentence is None:
+            sentence = object.__new__(cls)
+            for name, value in fields.items():
+                object.__setattr__(sentence, name, value)
+            object.__setattr__(sentence, "_hash", hash(key))
+            symbols = sentence.collect_symbols()
+            object.__setattr__(sentence, "_symbols", symbols)
+            Sentence.interned[key] = sentence
+        return sentence
+
+    def __setattr__(self, name, value):
+        raise AttributeError("logical sentences are immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("logical sentences are immutable")
+
+    def __eq__(self, other):
+        return self is other
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        return (type(self), self.arguments())
+
+    def arguments(self):
+        """Returns the arguments that construct this sentence."""
+        return ()
+
+    def collect_symbols(self):
+        """Returns the symbols of the sentence's arguments, computed once
+        when the sentence is created."""
+        return frozenset().union(*[a._symbols for a in self.arguments()])
 
     def evaluate(self, model):
         """Evaluates the logical sentence."""
@@ -13,7 +64,18 @@ class Sentence():
 
     def symbols(self):
         """Returns a set of all symbols in the logical sentence."""
-        return set()
+        return self._symbols
+
+    def source(self, index):
+        """Returns a Python expression evaluating the sentence over an
+        integer model `m`, where symbol `s` is bit `index[s]` of `m`."""
+        raise Exception("nothing to compile")
+
+    def truth_table(self, space):
+        """Returns the sentence's value in every model of `space` as an
+        integer bitset, where bit `m` is set if the sentence holds in
+        model `m`."""
+        raise Exception("nothing to evaluate")
 
     @classmethod
     def validate(cls, sentence):
@@ -43,15 +105,16 @@ class Sentence():
 
 
 class Symbol(Sentence):
+    __slots__ = ("name",)
 
-    def __init__(self, name):
-        self.name = name
+    def __new__(cls, name):
+        return cls.intern(("symbol", name), name=name)
 
-    def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
+    def arguments(self):
+        return (self.name,)
 
-    def __hash__(self):
-        return hash(("symbol", self.name))
+    def collect_symbols(self):
+        return frozenset([self.name])
 
     def __repr__(self):
         return self.name
@@ -65,20 +128,22 @@ class Symbol(Sentence):
     def formula(self):
         return self.name
 
-    def symbols(self):
-        return {self.name}
+    def source(self, index):
+        return f"(m >> {index[self.name]} & 1)"
+
+    def truth_table(self, space):
+        return space.symbol_table(self.name)
 
 
 class Not(Sentence):
-    def __init__(self, operand):
-        Sentence.validate(operand)
-        self.operand = operand
+    __slots__ = ("operand",)
 
-    def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
+    def __new__(cls, operand):
+        Sentence.validate(operand)
+        return cls.intern(("not", operand), operand=operand)
 
-    def __hash__(self):
-        return hash(("not", hash(self.operand)))
+    def arguments(self):
+        return (self.operand,)
 
     def __repr__(self):
         return f"Not({self.operand})"
@@ -89,23 +154,23 @@ class Not(Sentence):
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
-    def symbols(self):
-        return self.operand.symbols()
+    def source(self, index):
+        return f"(not {self.operand.source(index)})"
+
+    def truth_table(self, space):
+        return space.full ^ self.operand.truth_table(space)
 
 
 class And(Sentence):
-    def __init__(self, *conjuncts):
+    __slots__ = ("conjuncts",)
+
+    def __new__(cls, *conjuncts):
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
-        self.conjuncts = list(conjuncts)
+        return cls.intern(("and",) + conjuncts, conjuncts=conjuncts)
 
-    def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
-
-    def __hash__(self):
-        return hash(
-            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
-        )
+    def arguments(self):
+        return self.conjuncts
 
     def __repr__(self):
         conjunctions = ", ".join(
@@ -114,8 +179,11 @@ class And(Sentence):
         return f"And({conjunctions})"
 
     def add(self, conjunct):
-        Sentence.validate(conjunct)
-        self.conjuncts.append(conjunct)
+        """Conjunctions are immutable, so adding to one in place would
+        silently drop `conjunct`; build a new conjunction instead."""
+        raise AttributeError(
+            "sentences are immutable; use And(*knowledge.conjuncts, conjunct)"
+        )
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
@@ -126,23 +194,30 @@ class And(Sentence):
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+    def source(self, index):
+        if not self.conjuncts:
+            return "True"
+        return "(" + " and ".join(
+            conjunct.source(index) for conjunct in self.conjuncts
+        ) + ")"
+
+    def truth_table(self, space):
+        table = space.full
+        for conjunct in self.conjuncts:
+            table &= conjunct.truth_table(space)
+        return table
 
 
 class Or(Sentence):
-    def __init__(self, *disjuncts):
+    __slots__ = ("disjuncts",)
+
+    def __new__(cls, *disjuncts):
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
-        self.disjuncts = list(disjuncts)
-
-    def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
+        return cls.intern(("or",) + disjuncts, disjuncts=disjuncts)
 
-    def __hash__(self):
-        return hash(
-            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
-        )
+    def arguments(self):
+        return self.disjuncts
 
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
@@ -157,24 +232,31 @@ class Or(Sentence):
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+    def source(self, index):
+        if not self.disjuncts:
+            return "False"
+        return "(" + " or ".join(
+            disjunct.source(index) for disjunct in self.disjuncts
+        ) + ")"
+
+    def truth_table(self, space):
+        table = 0
+        for disjunct in self.disjuncts:
+            table |= disjunct.truth_table(space)
+        return table
 
 
 class Implication(Sentence):
-    def __init__(self, antecedent, consequent):
+    __slots__ = ("antecedent", "consequent")
+
+    def __new__(cls, antecedent, consequent):
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
-        self.antecedent = antecedent
-        self.consequent = consequent
+        return cls.intern(("implies", antecedent, consequent),
+                          antecedent=antecedent, consequent=consequent)
 
-    def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
-
-    def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+    def arguments(self):
+        return (self.antecedent, self.consequent)
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
@@ -188,24 +270,28 @@ class Implication(Sentence):
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
-    def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+    def source(self, index):
+        antecedent = self.antecedent.source(index)
+        consequent = self.consequent.source(index)
+        return f"(not {antecedent} or {consequent})"
+
+    def truth_table(self, space):
+        antecedent = self.antecedent.truth_table(space)
+        consequent = self.consequent.truth_table(space)
+        return (space.full ^ antecedent) | consequent
 
 
 class Biconditional(Sentence):
-    def __init__(self, left, right):
+    __slots__ = ("left", "right")
+
+    def __new__(cls, left, right):
         Sentence.validate(left)
         Sentence.validate(right)
-        self.left = left
-        self.right = right
+        return cls.intern(("biconditional", left, right),
+                          left=left, right=right)
 
-    def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
-
-    def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+    def arguments(self):
+        return (self.left, self.right)
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
@@ -221,8 +307,15 @@ class Biconditional(Sentence):
         right = Sentence.parenthesize(str(self.right))
         return f"{left} <=> {right}"
 
-    def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
+    def source(self, index):
+        left = self.left.source(index)
+        right = self.right.source(index)
+        return f"((not {left}) == (not {right}))"
+
+    def truth_table(self, space):
+        left = self.left.truth_table(space)
+        right = self.right.truth_table(space)
+        return space.full ^ (left ^ right)
 
 
 def model_check(knowledge, query):
@@ -241,7 +334,7 @@ def model_check(knowledge, query):
         else:
 
             # Choose one of the remaining unused symbols
-            remaining = symbols.copy()
+            remaining = set(symbols)
             p = remaining.pop()
 
             # Create a model where the symbol is true
@@ -257,7 +350,116 @@ def model_check(knowledge, query):
                     check_all(knowledge, query, remaining, model_false))
 
     # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
+    symbols = knowledge.symbols() | query.symbols()
 
     # Check that knowledge entails query
     return check_all(knowledge, query, symbols, dict())
+
+
+def symbol_index(*sentences):
+    """Maps each symbol in the sentences to a fixed bit position."""
+    names = sorted(frozenset().union(*[s.symbols() for s in sentences]))
+    return {name: i for i, name in enumerate(names)}
+
+
+def compile_sentence(sentence, index):
+    """Compiles sentence into a function of an integer model, where each
+    symbol is the bit given by `index`."""
+    return eval(f"lambda m: {sentence.source(index)}")
+
+
+def fast_model_check(knowledge, query):
+    """Checks if knowledge base entails query, like `model_check`, by
+    enumerating models as bit patterns and stopping at the first model
+    in which the knowledge base holds but the query does not."""
+    index = symbol_index(knowledge, query)
+    counterexample = compile_sentence(And(knowledge, Not(query)), index)
+    return not any(map(counterexample, range(2 ** len(index))))
+
+
+class ModelSpace():
+    """All 2^n models over a fixed set of n symbols, numbered so that
+    symbol `s` is true in model `m` when bit `index[s]` of `m` is set."""
+
+    def __init__(self, symbols):
+        self.index = {name: i for i, name in enumerate(sorted(symbols))}
+        self.size = 2 ** len(self.index)
+        self.full = (1 << self.size) - 1
+        self.tables = dict()
+
+    def symbol_table(self, name):
+        """Returns the bitset of models in which symbol `name` is true."""
+        if name not in self.tables:
+            position = self.index[name]
+
+            # one block of 2^position false models, then as many true ones
+            width = 2 << position
+            table = ((1 << (width // 2)) - 1) << (width // 2)
+
+            # repeat the block until it covers every model
+            while width < self.size:
+                table |= table << width
+                width *= 2
+            self.tables[name] = table
+        return self.tables[name]
+
+
+def truth_table_check(knowledge, query):
+    """Checks if knowledge base entails query, like `model_check`, by
+    evaluating both over every model at once as bitsets."""
+    space = ModelSpace(knowledge.symbols() | query.symbols())
+    return knowledge.truth_table(space) & ~query.truth_table(space) == 0
+
+
+class Models():
+    """The models of a knowledge base over a model space, enumerated once
+    as a truth table bitset so any number of queries can be checked
+    against them."""
+
+    def __init__(self, knowledge, symbols=frozenset()):
+        self.symbols = knowledge.symbols() | symbols
+        self.space = ModelSpace(self.symbols)
+        self.table = knowledge.truth_table(self.space)
+
+    def __len__(self):
+        return self.table.bit_count()
+
+    def __iter__(self):
+        """Yields each model as a dict from symbol name to value."""
+        table = self.table
+        while table:
+            m = (table & -table).bit_length() - 1
+            index = self.space.index
+            yield {name: bool(m >> i & 1) for name, i in index.items()}
+            table &= table - 1
+
+    def entails(self, query):
+        """Checks if query holds in every model."""
+        if not query.symbols() <= self.symbols:
+            raise ValueError("query has symbols outside the model space")
+        return self.table & ~query.truth_table(self.space) == 0
+
+
+# models of each knowledge base, kept while the knowledge base is alive
+cached_models = weakref.WeakKeyDictionary()
+
+
+def models(knowledge, symbols=frozenset()):
+    """Returns the Models of knowledge over its own symbols and `symbols`,
+    reusing the cached model set of an equal knowledge base if it already
+    covers those symbols."""
+    cached = cached_models.get(knowledge)
+    if cached is None or not symbols <= cached.symbols:
+        if cached is not None:
+            symbols = symbols | cached.symbols
+        cached = Models(knowledge, symbols)
+        cached_models[knowledge] = cached
+    return cached
+
+
+def entails_all(knowledge, queries):
+    """Checks, for each query, if knowledge base entails it, like
+    `model_check`, enumerating the knowledge base's models only once."""
+    symbols = frozenset().union(*[query.symbols() for query in queries])
+    knowledge_models = models(knowledge, symbols)
+    return [knowledge_models.entails(query) for query in queries]
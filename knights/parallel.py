@@ -0,0 +1,65 @@
+import math
+import multiprocessing
+import os
+
+from logic import *
+
+# models each worker checks between looks at the shared stop flag
+CHUNK = 1 << 14
+
+# state each worker process sets up once in `start_worker`
+worker = dict()
+
+
+def start_worker(sentence, index, found):
+    """Compiles `sentence` once per worker process."""
+    worker["counterexample"] = compile_sentence(sentence, index)
+    worker["found"] = found
+
+
+def check_cube(arguments):
+    """Returns True if any model in the cube holding the fixed assignment
+    `cube` to the high symbols is a counterexample. Gives up early, with
+    False, once another worker has found one."""
+    cube, cube_size = arguments
+    counterexample = worker["counterexample"]
+    found = worker["found"]
+    start = cube * cube_size
+    end = start + cube_size
+    for low in range(start, end, CHUNK):
+        if found.is_set():
+            return False
+        if any(map(counterexample, range(low, min(low + CHUNK, end)))):
+            found.set()
+            return True
+    return False
+
+
+def parallel_model_check(knowledge, query, processes=None, split=None):
+    """Checks if knowledge base entails query, like `model_check`, across a
+    pool of `processes` worker processes (one per core by default).
+
+    The models are split into 2^`split` cubes by fixing the values of the
+    `split` highest symbols, and each worker enumerates its cubes with
+    `fast_model_check`'s compiled sentence. As soon as any worker finds a
+    model where the knowledge base holds and the query does not, the pool
+    is stopped."""
+    processes = processes or os.cpu_count() or 1
+    index = symbol_index(knowledge, query)
+    if split is None:
+        split = math.ceil(math.log2(processes * 4))
+    split = min(split, len(index))
+    cube_size = 2 ** (len(index) - split)
+
+    found = multiprocessing.Event()
+    sentence = And(knowledge, Not(query))
+    with multiprocessing.Pool(processes, initializer=start_worker,
+                              initargs=(sentence, index, found)) as pool:
+        results = pool.imap_unordered(
+            check_cube, [(cube, cube_size) for cube in range(2 ** split)]
+        )
+        for counterexample in results:
+            if counterexample:
+                pool.terminate()
+                return False
+    return True
@@ -97,8 +97,8 @@ def main():
         if len(knowledge.conjuncts) == 0:
             print("    Not yet implemented.")
         else:
-            for symbol in symbols:
-                if model_check(knowledge, symbol):
+            for symbol, entailed in zip(symbols, entails_all(knowledge, symbols)):
+                if entailed:
                     print(f"    {symbol}")
 
 
@@ -0,0 +1,455 @@
+import heapq
+
+from logic import *
+
+
+class CNF():
+    """Tseitin encoding of logical sentences as clauses over integer
+    literals, where variable `v` is the literal `v` and its negation `-v`.
+    Every compound subsentence gets a fresh variable defined to be
+    equivalent to it, so the clauses grow linearly with the sentences."""
+
+    def __init__(self):
+        self.variables = dict()
+        self.names = dict()
+        self.clauses = []
+        self.count = 0
+        self.literals = dict()
+        self.true = None
+
+    def new_variable(self):
+        """Returns a fresh variable."""
+        self.count += 1
+        return self.count
+
+    def variable(self, name):
+        """Returns the variable for the symbol called `name`."""
+        if name not in self.variables:
+            variable = self.new_variable()
+            self.variables[name] = variable
+            self.names[variable] = name
+        return self.variables[name]
+
+    def constant(self, value):
+        """Returns a literal that is always `value`."""
+        if self.true is None:
+            self.true = self.new_variable()
+            self.clauses.append([self.true])
+        return self.true if value else -self.true
+
+    def literal(self, sentence):
+        """Returns a literal equivalent to `sentence`, adding the clauses
+        that define it if it has not been encoded before."""
+        if isinstance(sentence, Symbol):
+            return self.variable(sentence.name)
+        if isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+        if sentence in self.literals:
+            return self.literals[sentence]
+
+        if isinstance(sentence, And):
+            literal = self.gate([self.literal(c) for c in sentence.conjuncts],
+                                conjunction=True)
+        elif isinstance(sentence, Or):
+            literal = self.gate([self.literal(d) for d in sentence.disjuncts],
+                                conjunction=False)
+        elif isinstance(sentence, Implication):
+            literal = self.gate([-self.literal(sentence.antecedent),
+                                 self.literal(sentence.consequent)],
+                                conjunction=False)
+        elif isinstance(sentence, Biconditional):
+            left = self.literal(sentence.left)
+            right = self.literal(sentence.right)
+            literal = self.new_variable()
+            self.clauses.extend([
+                [-literal, -left, right],
+                [-literal, left, -right],
+                [literal, left, right],
+                [literal, -left, -right],
+            ])
+        else:
+            raise TypeError("must be a logical sentence")
+
+        self.literals[sentence] = literal
+        return literal
+
+    def gate(self, inputs, conjunction):
+        """Returns a fresh literal defined as the conjunction (or the
+        disjunction) of the `inputs` literals."""
+        if not inputs:
+            return self.constant(conjunction)
+        if len(inputs) == 1:
+            return inputs[0]
+
+        # for a disjunction, encode the conjunction of the negated inputs
+        sign = 1 if conjunction else -1
+        output = self.new_variable()
+        for literal in inputs:
+            self.clauses.append([-output, sign * literal])
+        self.clauses.append([output] + [-sign * literal for literal in inputs])
+        return sign * output
+
+    def add(self, sentence):
+        """Adds clauses asserting that `sentence` is true."""
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        elif isinstance(sentence, Or):
+            self.clauses.append([self.literal(d) for d in sentence.disjuncts])
+        elif isinstance(sentence, Implication):
+            self.clauses.append([-self.literal(sentence.antecedent),
+                                 self.literal(sentence.consequent)])
+        else:
+            self.clauses.append([self.literal(sentence)])
+
+
+class Solver():
+    """CDCL SAT solver with two watched literals per clause, unit
+    propagation, first-UIP clause learning, activity-based branching and
+    restarts. Clauses can be added between calls to `solve`, and learned
+    clauses are kept."""
+
+    def __init__(self):
+        self.count = 0
+        self.assigns = [None]
+        self.levels = [0]
+        self.reasons = [None]
+        self.activity = [0.0]
+        self.phases = [False]
+        self.watches = dict()
+        self.clauses = []
+        self.learned = []
+        self.trail = []
+        self.trail_limits = []
+        self.head = 0
+        self.heap = []
+        self.increment = 1.0
+        self.ok = True
+        self.model = None
+
+    def reserve(self, variable):
+        """Makes room for variables up to `variable`."""
+        while self.count < variable:
+            self.count += 1
+            self.assigns.append(None)
+            self.levels.append(0)
+            self.reasons.append(None)
+            self.activity.append(0.0)
+            self.phases.append(False)
+            self.watches[self.count] = []
+            self.watches[-self.count] = []
+            heapq.heappush(self.heap, (0.0, self.count))
+
+    def value(self, literal):
+        """Returns the literal's value, or None if it is unassigned."""
+        assigned = self.assigns[abs(literal)]
+        if assigned is None:
+            return None
+        return assigned == (literal > 0)
+
+    def level(self):
+        return len(self.trail_limits)
+
+    def add_clause(self, clause):
+        """Adds a clause; returns False if the clauses are now unsatisfiable."""
+        if not self.ok:
+            return False
+        self.backtrack(0)
+        self.reserve(max((abs(literal) for literal in clause), default=0))
+
+        # drop duplicate and false literals, skip clauses already satisfied
+        literals = []
+        for literal in clause:
+            value = self.value(literal)
+            if value is True or -literal in literals:
+                return True
+            if value is None and literal not in literals:
+                literals.append(literal)
+
+        if not literals:
+            self.ok = False
+        elif len(literals) == 1:
+            self.assign(literals[0], None)
+            self.ok = self.propagate() is None
+        else:
+            self.clauses.append(literals)
+            self.watch(literals)
+        return self.ok
+
+    def watch(self, clause):
+        self.watches[clause[0]].append(clause)
+        self.watches[clause[1]].append(clause)
+
+    def assign(self, literal, reason):
+        variable = abs(literal)
+        self.assigns[variable] = literal > 0
+        self.levels[variable] = self.level()
+        self.reasons[variable] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """Propagates every unit clause; returns a conflicting clause, or
+        None if there is no conflict."""
+        while self.head < len(self.trail):
+            false_literal = -self.trail[self.head]
+            self.head += 1
+            watchers = self.watches[false_literal]
+            self.watches[false_literal] = kept = []
+            for i, clause in enumerate(watchers):
+
+                # keep the false literal in the second watched position
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], clause[0]
+                first = clause[0]
+                if self.value(first) is True:
+                    kept.append(clause)
+                    continue
+
+                # look for another literal to watch
+                for k in range(2, len(clause)):
+                    if self.value(clause[k]) is not False:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        self.watches[clause[1]].append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if self.value(first) is False:
+                        kept.extend(watchers[i + 1:])
+                        return clause
+                    self.assign(first, clause)
+        return None
+
+    def analyze(self, conflict):
+        """Returns the first-UIP clause learned from `conflict`, with the
+        asserting literal first, and the level to backjump to."""
+        learned = [None]
+        seen = set()
+        pending = 0
+        index = len(self.trail) - 1
+        clause = conflict
+        literal = None
+        while True:
+            for other in (clause if literal is None else clause[1:]):
+                variable = abs(other)
+                if variable in seen or self.levels[variable] == 0:
+                    continue
+                seen.add(variable)
+                self.bump(variable)
+                if self.levels[variable] == self.level():
+                    pending += 1
+                else:
+                    learned.append(other)
+
+            # walk back to the most recent literal involved in the conflict
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.reasons[abs(literal)]
+
+        learned[0] = -literal
+        if len(learned) == 1:
+            return learned, 0
+
+        # watch the literal from the highest remaining level second
+        second = max(range(1, len(learned)),
+                     key=lambda i: self.levels[abs(learned[i])])
+        learned[1], learned[second] = learned[second], learned[1]
+        return learned, self.levels[abs(learned[1])]
+
+    def bump(self, variable):
+        self.activity[variable] += self.increment
+        if self.activity[variable] > 1e100:
+            self.activity = [activity * 1e-100 for activity in self.activity]
+            self.increment *= 1e-100
+            self.heap = [(-self.activity[v], v) for v in range(1, self.count + 1)
+                         if self.assigns[v] is None]
+            heapq.heapify(self.heap)
+        elif self.assigns[variable] is None:
+            heapq.heappush(self.heap, (-self.activity[variable], variable))
+
+    def backtrack(self, level):
+        """Undoes every assignment made above `level`."""
+        if self.level() <= level:
+            return
+        start = self.trail_limits[level]
+        for literal in self.trail[start:]:
+            variable = abs(literal)
+            self.phases[variable] = literal > 0
+            self.assigns[variable] = None
+            self.reasons[variable] = None
+            heapq.heappush(self.heap, (-self.activity[variable], variable))
+        del self.trail[start:]
+        del self.trail_limits[level:]
+        self.head = len(self.trail)
+
+    def decide(self):
+        """Returns the unassigned variable with the highest activity, or
+        None if every variable is assigned."""
+        while self.heap:
+            _, variable = heapq.heappop(self.heap)
+            if self.assigns[variable] is None:
+                return variable
+        return None
+
+    def solve(self, assumptions=()):
+        """Returns True if the clauses are satisfiable with every literal in
+        `assumptions` true, and records a satisfying model in `self.model`
+        as a dict from variable to value."""
+        self.model = None
+        if not self.ok:
+            return False
+        for literal in assumptions:
+            self.reserve(abs(literal))
+        self.backtrack(0)
+        if self.propagate() is not None:
+            self.ok = False
+            return False
+
+        conflicts = 0
+        restart_limit = 100
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                if self.level() == 0:
+                    self.ok = False
+                    return False
+                conflicts += 1
+                learned, level = self.analyze(conflict)
+                self.backtrack(level)
+                if len(learned) == 1:
+                    self.assign(learned[0], None)
+                else:
+                    self.learned.append(learned)
+                    self.watch(learned)
+                    self.assign(learned[0], learned)
+                self.increment /= 0.95
+                continue
+
+            if conflicts >= restart_limit:
+                conflicts = 0
+                restart_limit = int(restart_limit * 1.5)
+                self.backtrack(0)
+                continue
+
+            # assumptions are decided first, one per level
+            literal = None
+            while self.level() < len(assumptions):
+                assumption = assumptions[self.level()]
+                value = self.value(assumption)
+                if value is False:
+                    self.backtrack(0)
+                    return False
+                self.trail_limits.append(len(self.trail))
+                if value is None:
+                    literal = assumption
+                    break
+            if literal is None:
+                variable = self.decide()
+                if variable is None:
+                    self.model = {v: self.assigns[v]
+                                  for v in range(1, self.count + 1)}
+                    self.backtrack(0)
+                    return True
+                literal = variable if self.phases[variable] else -variable
+                self.trail_limits.append(len(self.trail))
+            self.assign(literal, None)
+
+
+def sat_entails(knowledge, query):
+    """Checks if knowledge base entails query, like `model_check`, by
+    showing that knowledge together with the negated query is
+    unsatisfiable."""
+    cnf = CNF()
+    cnf.add(knowledge)
+    cnf.add(Not(query))
+    solver = Solver()
+    for clause in cnf.clauses:
+        if not solver.add_clause(clause):
+            return True
+    return not solver.solve()
+
+
+class KnowledgeBase():
+    """A knowledge base that keeps one CNF encoding and one solver, with
+    its learned clauses and propagated units, across every `add` and
+    every query.
+
+    `push` opens a scope whose sentences are removed again by `pop`, and
+    queries can be asked under temporary assumptions without changing the
+    knowledge base."""
+
+    def __init__(self, *sentences):
+        self.cnf = CNF()
+        self.solver = Solver()
+        self.flushed = 0
+        self.scopes = [(None, [])]
+        for sentence in sentences:
+            self.add(sentence)
+
+    @property
+    def knowledge(self):
+        """Returns every sentence in an open scope as one conjunction."""
+        return And(*[s for _, sentences in self.scopes for s in sentences])
+
+    def flush(self):
+        """Passes any clauses the encoder added to the solver."""
+        clauses = self.cnf.clauses
+        while self.flushed < len(clauses):
+            self.solver.add_clause(clauses[self.flushed])
+            self.flushed += 1
+
+    def add(self, sentence):
+        """Adds `sentence` to the innermost open scope."""
+        Sentence.validate(sentence)
+        selector, sentences = self.scopes[-1]
+        sentences.append(sentence)
+        if selector is None:
+            self.cnf.add(sentence)
+            self.flush()
+        else:
+            # only holds while the scope's selector is assumed true
+            literal = self.cnf.literal(sentence)
+            self.flush()
+            self.solver.add_clause([-selector, literal])
+
+    def push(self):
+        """Opens a new scope."""
+        self.scopes.append((self.cnf.new_variable(), []))
+
+    def pop(self):
+        """Closes the innermost scope, removing the sentences added in it."""
+        if len(self.scopes) == 1:
+            raise IndexError("no scope to pop")
+        selector, _ = self.scopes.pop()
+
+        # clauses learned from the scope all contain -selector, so
+        # asserting it retires them along with the scope's sentences
+        self.solver.add_clause([-selector])
+
+    def assumption_literals(self, assumptions):
+        literals = [selector for selector, _ in self.scopes[1:]]
+        literals.extend(self.cnf.literal(sentence) for sentence in assumptions)
+        self.flush()
+        return literals
+
+    def satisfiable(self, assumptions=()):
+        """Checks if the knowledge base and `assumptions` can all be true."""
+        return self.solver.solve(self.assumption_literals(assumptions))
+
+    def entails(self, query, assumptions=()):
+        """Checks if the knowledge base, together with `assumptions`,
+        entails query."""
+        literals = self.assumption_literals(list(assumptions) + [Not(query)])
+        return not self.solver.solve(literals)
+
+    def model(self, assumptions=()):
+        """Returns a dict from symbol name to value satisfying the knowledge
+        base and `assumptions`, or None if there is no such model."""
+        if not self.satisfiable(assumptions):
+            return None
+        return {name: self.solver.model[variable]
+                for name, variable in self.cnf.variables.items()}
@@ -0,0 +1,146 @@
+from logic import *
+
+# the empty conjunction is always true and the empty disjunction always false
+TRUE = And()
+FALSE = Or()
+
+
+def constant(value):
+    return TRUE if value else FALSE
+
+
+def children(sentence):
+    """Returns the sentences directly inside `sentence`."""
+    return () if isinstance(sentence, Symbol) else sentence.arguments()
+
+
+def node_count(sentence):
+    """Returns the number of nodes evaluated when evaluating `sentence`,
+    counting shared subsentences once per occurrence."""
+    return 1 + sum(node_count(child) for child in children(sentence))
+
+
+def negate(sentence):
+    """Returns the simplified negation of an already simplified sentence."""
+    if sentence is TRUE:
+        return FALSE
+    if sentence is FALSE:
+        return TRUE
+    if isinstance(sentence, Not):
+        return sentence.operand
+    return Not(sentence)
+
+
+def literal_fact(sentence):
+    """Returns `(name, value)` if `sentence` is a symbol or a negated
+    symbol that is true exactly when symbol `name` has `value`."""
+    if isinstance(sentence, Symbol):
+        return sentence.name, True
+    if isinstance(sentence, Not) and isinstance(sentence.operand, Symbol):
+        return sentence.operand.name, False
+    return None
+
+
+def simplify(sentence, facts=None):
+    """Returns a sentence equivalent to `sentence`, given that each symbol
+    named in `facts` has the value it maps to, with nested conjunctions
+    and disjunctions flattened, double negations removed and constant
+    subsentences folded away. TRUE and FALSE stand for the constants.
+
+    Unit facts are propagated: a symbol (or negated symbol) conjoined
+    with other sentences is substituted into them, as is the negation of
+    one disjoined with other sentences, and likewise for the antecedent
+    and consequent of an implication."""
+    facts = facts or dict()
+    simplified = dict()
+
+    def visit(sentence):
+        if sentence not in simplified:
+            simplified[sentence] = rewrite(sentence)
+        return simplified[sentence]
+
+    def assuming(sentence, literal, value):
+        """Returns `sentence` simplified given that `literal` has `value`."""
+        fact = literal_fact(literal)
+        if fact is None:
+            return visit(sentence)
+        name, literal_value = fact
+        return simplify(sentence, {**facts, name: literal_value == value})
+
+    def junction(kind, operands):
+        """Returns the simplified conjunction or disjunction of the already
+        simplified operands."""
+        absorbing = FALSE if kind is And else TRUE
+        flat = []
+        for operand in operands:
+            nested = children(operand) if type(operand) is kind else [operand]
+            for child in nested:
+                if child is absorbing:
+                    return absorbing
+                if child not in flat:
+                    flat.append(child)
+
+        # a sentence next to its own negation decides the whole thing
+        present = set(flat)
+        if any(negate(operand) in present for operand in flat):
+            return absorbing
+
+        # literals are true in a conjunction (false in a disjunction)
+        # whenever the other operands matter
+        context = dict(facts)
+        for operand in flat:
+            fact = literal_fact(operand)
+            if fact is not None:
+                name, value = fact
+                context[name] = value if kind is And else not value
+        if len(context) > len(facts):
+            rewritten = [operand if literal_fact(operand) else
+                         simplify(operand, context) for operand in flat]
+            if rewritten != flat:
+                return junction(kind, rewritten)
+
+        return flat[0] if len(flat) == 1 else kind(*flat)
+
+    def rewrite(sentence):
+        if isinstance(sentence, Symbol):
+            if sentence.name in facts:
+                return constant(facts[sentence.name])
+            return sentence
+
+        if isinstance(sentence, Not):
+            return negate(visit(sentence.operand))
+
+        if isinstance(sentence, (And, Or)):
+            return junction(type(sentence), list(map(visit, children(sentence))))
+
+        if isinstance(sentence, Implication):
+            antecedent = visit(sentence.antecedent)
+            consequent = assuming(sentence.consequent, antecedent, True)
+            antecedent = assuming(sentence.antecedent, consequent, False)
+            if antecedent is FALSE or consequent is TRUE:
+                return TRUE
+            if antecedent is TRUE:
+                return consequent
+            if consequent is FALSE:
+                return negate(antecedent)
+            if antecedent is consequent:
+                return TRUE
+            return Implication(antecedent, consequent)
+
+        if isinstance(sentence, Biconditional):
+            left = visit(sentence.left)
+            right = visit(sentence.right)
+            if left is right:
+                return TRUE
+            if left is negate(right):
+                return FALSE
+            for constant_side, other in ((left, right), (right, left)):
+                if constant_side is TRUE:
+                    return other
+                if constant_side is FALSE:
+                    return negate(other)
+            return Biconditional(left, right)
+
+        raise TypeError("must be a logical sentence")
+
+    return visit(sentence)
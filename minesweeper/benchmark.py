@@ -0,0 +1,197 @@
+"""
+Minesweeper AI benchmarks
+
+Plays seeded games headlessly across a pool of worker processes and
+reports the AI's win rate, its speed, the growth of its knowledge base
+and its peak memory.
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import time
+import tracemalloc
+
+from minesweeper import Minesweeper, MinesweeperAI
+
+# (height, width, mines) of the boards played by default: expert, and a
+# large board at the same density
+BOARDS = [(16, 30, 99), (100, 100, 2062)]
+
+GAMES = 20
+
+# games per board replayed in this process to measure peak memory
+MEMORY_GAMES = 3
+
+# the knowledge base size is reported at each of these fractions of a game
+PROGRESS = [0.1, 0.25, 0.5, 0.75, 1.0]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Play seeded Minesweeper games with the AI and time its moves."
+    )
+    parser.add_argument("--games", type=int, default=GAMES, help="games per board")
+    parser.add_argument(
+        "--board",
+        nargs=3,
+        type=int,
+        metavar=("HEIGHT", "WIDTH", "MINES"),
+        help="play only this board",
+    )
+    parser.add_argument(
+        "--density",
+        type=float,
+        help="fill this share of each board's cells with mines instead",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=None,
+        help="worker processes (default: one per core)",
+    )
+    parser.add_argument(
+        "--memory-games",
+        type=int,
+        default=MEMORY_GAMES,
+        help=f"games per board to trace for peak memory (default {MEMORY_GAMES})",
+    )
+    args = parser.parse_args()
+
+    processes = args.processes or os.cpu_count() or 1
+    for height, width, mines in [args.board] if args.board else BOARDS:
+        if args.density is not None:
+            mines = round(height * width * args.density)
+        print(f"{args.games} games on {height}x{width} with {mines} mines")
+        seeds = range(args.seed, args.seed + args.games)
+        report(run(height, width, mines, seeds, processes))
+
+        if args.memory_games:
+            peak = max(
+                peak_memory(height, width, mines, seed)
+                for seed in seeds[: args.memory_games]
+            )
+            print(f"    peak memory {peak / 1024:.0f} KiB")
+
+
+def play_game(height, width, mines, seed):
+    """
+    Plays one game on a board laid out from `seed` and returns a dict of
+    whether the AI found every mine (`won`), the number of cells it
+    revealed (`moves`), the seconds spent in the AI (`seconds`), the
+    seconds each call to make_random_move() (`guesses`) and add_knowledge()
+    (`updates`) took, and the number of sentences the AI knew after each
+    move (`sizes`).
+    """
+    random.seed(seed)
+    game = Minesweeper(height=height, width=width, mines=mines)
+    ai = MinesweeperAI(height=height, width=width, mines=mines)
+
+    result = dict(won=False, moves=0, seconds=0, guesses=[], updates=[], sizes=[])
+    while True:
+        start = time.perf_counter()
+        move = ai.make_safe_move()
+        if move is None:
+            move = ai.make_random_move()
+            result["guesses"].append(time.perf_counter() - start)
+        result["seconds"] += time.perf_counter() - start
+        if move is None or game.is_mine(move):
+            return result
+
+        nearby = game.nearby_mines(move)
+        start = time.perf_counter()
+        ai.add_knowledge(move, nearby)
+        update = time.perf_counter() - start
+        result["updates"].append(update)
+        result["seconds"] += update
+        result["moves"] += 1
+        result["sizes"].append(len(ai.knowledge))
+        if ai.mines == game.mines:
+            result["won"] = True
+            return result
+
+
+def run(height, width, mines, seeds, processes):
+    """
+    Plays a game from each of `seeds` across `processes` worker processes,
+    returning the results of play_game() and the seconds taken.
+    """
+    start = time.perf_counter()
+    with multiprocessing.Pool(processes) as pool:
+        results = pool.starmap(
+            play_game,
+            [(height, width, mines, seed) for seed in seeds],
+            chunksize=max(1, len(seeds) // (processes * 4)),
+        )
+    return results, time.perf_counter() - start
+
+
+def peak_memory(height, width, mines, seed):
+    """
+    Returns the most memory, in bytes, allocated at once while playing the
+    game from `seed` in this process.
+    """
+    tracemalloc.start()
+    try:
+        play_game(height, width, mines, seed)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def report(outcome):
+    """
+    Prints the win rate and the AI's speed over a run, and how large its
+    knowledge base was on average at each point of progress through a game.
+    """
+    results, elapsed = outcome
+    wins = sum(result["won"] for result in results)
+    moves = sum(result["moves"] for result in results)
+    seconds = sum(result["seconds"] for result in results)
+    print(
+        f"    won {wins} of {len(results)} ({wins / len(results):.0%}),"
+        f" {len(results) / elapsed:.1f} games/s"
+    )
+    print(
+        f"    {moves} moves in {seconds:.2f}s,"
+        f" {moves / seconds if seconds else 0:.0f} moves/s"
+    )
+
+    for name, key in [("make_random_move", "guesses"), ("add_knowledge", "updates")]:
+        times = sorted(time for result in results for time in result[key])
+        if times:
+            print(
+                f"    {len(times)} {name} calls,"
+                f" mean {sum(times) / len(times) * 1000:.3f} ms,"
+                f" p50 {percentile(times, 0.5) * 1000:.3f} ms,"
+                f" p99 {percentile(times, 0.99) * 1000:.3f} ms,"
+                f" max {times[-1] * 1000:.3f} ms"
+            )
+
+    played = [result["sizes"] for result in results if result["sizes"]]
+    if played:
+        averages = [
+            sum(game[min(len(game) - 1, int(fraction * len(game)))] for game in played)
+            / len(played)
+            for fraction in PROGRESS
+        ]
+        sizes = ", ".join(
+            f"{size:.0f} at {fraction:.0%}"
+            for size, fraction in zip(averages, PROGRESS)
+        )
+        largest = max(max(game) for game in played)
+        print(f"    knowledge base {sizes} of a game, {largest} sentences at most")
+
+
+def percentile(values, fraction):
+    """
+    Returns the value `fraction` of the way through the sorted values.
+    """
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,10 @@
-import itertools
+import math
 import random
+from collections import deque
+
+# share of cells assumed to be mines when the AI is not told how many there
+# are: that of the default 8x8 board with 8 mines
+DEFAULT_DENSITY = 8 / 64
 
 
 class Minesweeper:
@@ -84,30 +89,114 @@ class Minesweeper:
         return self.mines_found == self.mines
 
 
+def bits(mask):
+    """
+    Yields the index of every set bit in `mask`, lowest first.
+    """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class Grid:
+    """
+    Numbering of board cells as the bits of an integer
+    Cell (i, j) of a `height` x `width` board is bit i * width + j, and
+    any other cell gets the next free bit the first time it is seen.
+    """
+
+    def __init__(self, height=0, width=0):
+        self.height = height
+        self.width = width
+        self.cell_at = [(i, j) for i in range(height) for j in range(width)]
+        self.index = {cell: k for k, cell in enumerate(self.cell_at)}
+        self.all = (1 << len(self.cell_at)) - 1
+
+        # mask of the cells within one row and column of each board cell
+        self.neighbors = []
+        for i, j in self.cell_at:
+            mask = 0
+            for a in range(max(i - 1, 0), min(i + 2, height)):
+                for b in range(max(j - 1, 0), min(j + 2, width)):
+                    if (a, b) != (i, j):
+                        mask |= 1 << (a * width + b)
+            self.neighbors.append(mask)
+
+        # board cells' bit indices, those with fewest neighbors first
+        self.by_neighbors = sorted(
+            range(len(self.cell_at)),
+            key=lambda k: (self.neighbors[k].bit_count(), self.cell_at[k]),
+        )
+
+    def bit(self, cell):
+        """
+        Returns the bit of `cell`.
+        """
+        if cell not in self.index:
+            self.index[cell] = len(self.cell_at)
+            self.cell_at.append(cell)
+        return 1 << self.index[cell]
+
+    def mask(self, cells):
+        """
+        Returns the mask of a collection of cells.
+        """
+        mask = 0
+        for cell in cells:
+            mask |= self.bit(cell)
+        return mask
+
+    def cells_of(self, mask):
+        """
+        Returns the cells of a mask as a frozenset.
+        """
+        return frozenset(self.cell_at[k] for k in bits(mask))
+
+
+# numbering for sentences created without a board's grid
+DEFAULT_GRID = Grid()
+
+
 class Sentence:
     """
     Logical statement about a Minesweeper game
     A sentence consists of a set of board cells,
     and a count of the number of those cells which are mines.
+
+    The cells are stored as a mask of `grid` bits; `cells` is a read-only
+    view of them.
     """
 
-    def __init__(self, cells, count):
-        self.cells = set(cells)
+    __slots__ = ("grid", "mask", "count")
+
+    def __init__(self, cells, count, grid=None):
+        self.grid = grid or DEFAULT_GRID
+        self.mask = cells if isinstance(cells, int) else self.grid.mask(cells)
         self.count = count
 
+    @property
+    def cells(self):
+        return self.grid.cells_of(self.mask)
+
     def __eq__(self, other):
+        if self.grid is other.grid:
+            return self.mask == other.mask and self.count == other.count
         return self.cells == other.cells and self.count == other.count
 
     def __str__(self):
-        return f"{self.count} {self.cells or '{}'}"
+        return f"{self.count} {set(self.cells) or '{}'}"
         # return f"{self.cells} = {self.count}"
 
+    def __len__(self):
+        return self.mask.bit_count()
+
     # TODO
     def known_mines(self):
         """
         Returns the set of all cells in self.cells known to be mines.
         """
-        if len(self.cells) == self.count:
+        if self.mask.bit_count() == self.count:
             return self.cells
         return set()
 
@@ -126,8 +215,9 @@ class Sentence:
         Updates internal knowledge representation given the fact that
         a cell is known to be a mine.
         """
-        if cell in self.cells:
-            self.cells.remove(cell)
+        bit = self.grid.bit(cell)
+        if self.mask & bit:
+            self.mask ^= bit
             self.count -= 1
 
     # TODO
@@ -136,8 +226,215 @@ class Sentence:
         Updates internal knowledge representation given the fact that
         a cell is known to be safe.
         """
-        if cell in self.cells:
-            self.cells.remove(cell)
+        bit = self.grid.bit(cell)
+        if self.mask & bit:
+            self.mask ^= bit
+
+
+class Knowledge:
+    """
+    Store of the sentences known about a Minesweeper game
+    Each sentence is kept once, under its (cell mask, count) key, and
+    every cell's bit maps to the keys of the sentences that mention it,
+    so that duplicates are found by hashing and marking a cell only
+    touches the sentences containing it.
+    """
+
+    def __init__(self, grid=None):
+        self.grid = grid or DEFAULT_GRID
+        self.sentences = dict()
+        self.by_cell = dict()
+
+    def __len__(self):
+        return len(self.sentences)
+
+    def __iter__(self):
+        # iterate over a snapshot, so sentences can be marked meanwhile
+        return iter(list(self.sentences.values()))
+
+    def __contains__(self, sentence):
+        return self.key(sentence) in self.sentences
+
+    @staticmethod
+    def key(sentence):
+        return sentence.mask, sentence.count
+
+    def add(self, sentence):
+        """
+        Adds `sentence` unless it is empty or already known, and returns
+        whether it was added.
+        """
+        key = self.key(sentence)
+        if not sentence.mask or key in self.sentences:
+            return False
+        self.sentences[key] = sentence
+        for k in bits(sentence.mask):
+            self.by_cell.setdefault(k, set()).add(key)
+        return True
+
+    def remove(self, sentence):
+        """
+        Removes `sentence`, which must be in the store unchanged since it
+        was added.
+        """
+        key = self.key(sentence)
+        del self.sentences[key]
+        for k in bits(sentence.mask):
+            keys = self.by_cell[k]
+            keys.discard(key)
+            if not keys:
+                del self.by_cell[k]
+
+    def stored(self, sentence):
+        """
+        Returns True if `sentence` itself is in the store.
+        """
+        return self.sentences.get(self.key(sentence)) is sentence
+
+    def overlapping(self, sentence):
+        """
+        Returns the other sentences that share a cell with `sentence`.
+        """
+        keys = set()
+        for k in bits(sentence.mask):
+            keys.update(self.by_cell[k])
+        keys.discard(self.key(sentence))
+        return [self.sentences[key] for key in keys]
+
+    def at(self, k):
+        """
+        Returns the sentences that mention the cell with bit index `k`.
+        """
+        return [self.sentences[key] for key in self.by_cell.get(k, ())]
+
+    def containing(self, cell):
+        """
+        Returns the sentences that mention `cell`.
+        """
+        return self.at(self.grid.index.get(cell))
+
+    def mark(self, cell, mine):
+        """
+        Removes `cell` from every sentence that mentions it, as a mine if
+        `mine` is True and as a safe cell otherwise, and returns the
+        sentences changed that are still in the store. Sentences left
+        empty, or equal to another sentence, are dropped.
+        """
+        changed = []
+        for sentence in self.containing(cell):
+            self.remove(sentence)
+            if mine:
+                sentence.mark_mine(cell)
+            else:
+                sentence.mark_safe(cell)
+            if self.add(sentence):
+                changed.append(sentence)
+        return changed
+
+
+def convolve(a, b):
+    """
+    Returns the product of two polynomials given as {power: coefficient}
+    dicts. Here the coefficient of t counts arrangements with t mines.
+    """
+    product = dict()
+    for i, x in a.items():
+        for j, y in b.items():
+            product[i + j] = product.get(i + j, 0) + x * y
+    return product
+
+
+def shifted(polynomial, v):
+    """
+    Returns the polynomial multiplied by t^v.
+    """
+    return polynomial if v == 0 else {t + v: ways for t, ways in polynomial.items()}
+
+
+def add_into(total, polynomial):
+    for t, ways in polynomial.items():
+        total[t] = total.get(t, 0) + ways
+
+
+def count_arrangements(cells, sentences):
+    """
+    Counts the arrangements of mines in `cells` (a list) consistent with
+    every sentence in `sentences`, which mention only those cells.
+
+    Returns `(total, mine)`: `total` maps t to the number of arrangements
+    with t mines, and `mine[cell]` does the same for the arrangements in
+    which `cell` is a mine.
+
+    The cells are decided in order, and arrangements of the cells decided
+    so far are grouped by how many mines each sentence still spanning
+    them is missing, which is all that matters for the cells left. Each
+    group is counted once from the front and once from the back, and a
+    cell's count combines the groups on either side of it.
+    """
+    n = len(cells)
+    position = {cell: i for i, cell in enumerate(cells)}
+    spans = []
+    for sentence in sentences:
+        places = sorted(position[cell] for cell in sentence.cells)
+        spans.append((places[0], places[-1], sentence.count, places))
+    at_cell = [[] for _ in range(n)]
+    for k, (_, _, _, places) in enumerate(spans):
+        for i in places:
+            at_cell[i].append(k)
+
+    # active[i] lists the sentences with cells both before and from cell i
+    active = [
+        [k for k, (first, last, _, _) in enumerate(spans) if first < i <= last]
+        for i in range(n + 1)
+    ]
+
+    def step(i, state, v):
+        """
+        Returns the state after cell i when it holds `v` mines, or None if
+        some sentence can no longer be satisfied.
+        """
+        missing = dict(zip(active[i], state))
+        for k in at_cell[i]:
+            first, last, count, places = spans[k]
+            left = missing.get(k, count) - v
+            if left < 0 or left > sum(1 for p in places if p > i):
+                return None
+            missing[k] = left
+        return tuple(missing[k] for k in active[i + 1])
+
+    forward = [{(): {0: 1}}]
+    for i in range(n):
+        following = dict()
+        for state, polynomial in forward[i].items():
+            for v in (0, 1):
+                after = step(i, state, v)
+                if after is not None:
+                    add_into(
+                        following.setdefault(after, dict()), shifted(polynomial, v)
+                    )
+        forward.append(following)
+
+    backward = [None] * n + [{(): {0: 1}}]
+    for i in range(n - 1, -1, -1):
+        backward[i] = dict()
+        for state in forward[i]:
+            total = dict()
+            for v in (0, 1):
+                after = step(i, state, v)
+                if after is not None and after in backward[i + 1]:
+                    add_into(total, shifted(backward[i + 1][after], v))
+            backward[i][state] = total
+
+    mine = dict()
+    for i, cell in enumerate(cells):
+        mine[cell] = dict()
+        for state, polynomial in forward[i].items():
+            after = step(i, state, 1)
+            if after is not None and after in backward[i + 1]:
+                add_into(
+                    mine[cell], convolve(polynomial, shifted(backward[i + 1][after], 1))
+                )
+    return backward[0].get((), dict()), mine
 
 
 class MinesweeperAI:
@@ -145,21 +442,33 @@ class MinesweeperAI:
     Minesweeper game player
     """
 
-    def __init__(self, height=8, width=8):
+    def __init__(self, height=8, width=8, mines=None):
 
         # Set initial height and width
         self.height = height
         self.width = width
 
+        # Number of mines on the board, estimated if not given
+        if mines is None:
+            mines = round(height * width * DEFAULT_DENSITY)
+        self.total_mines = mines
+
         # Keep track of which cells have been clicked on
         self.moves_made = set()
 
-        # Keep track of cells known to be safe or mines
+        # Keep track of cells known to be safe or mines, also as masks
         self.mines = set()
         self.safes = set()
+        self.grid = Grid(height, width)
+        self.mine_mask = 0
+        self.known_mask = 0
+        self.moves_mask = 0
+
+        # Sentences about the game known to be true
+        self.knowledge = Knowledge(self.grid)
 
-        # List of sentences about the game known to be true
-        self.knowledge: list[Sentence] = []
+        # Sentences added or changed that inference has yet to look at
+        self.pending = deque()
 
         # TODO
         # compute an array with all available cells
@@ -173,8 +482,9 @@ class MinesweeperAI:
         to mark that cell as a mine as well.
         """
         self.mines.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_mine(cell)
+        self.mine_mask |= self.grid.bit(cell)
+        self.known_mask |= self.grid.bit(cell)
+        self.pending.extend(self.knowledge.mark(cell, mine=True))
 
     def mark_safe(self, cell):
         """
@@ -182,8 +492,8 @@ class MinesweeperAI:
         to mark that cell as safe as well.
         """
         self.safes.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_safe(cell)
+        self.known_mask |= self.grid.bit(cell)
+        self.pending.extend(self.knowledge.mark(cell, mine=False))
 
     # TODO
     def add_knowledge(self, cell, count):
@@ -201,132 +511,76 @@ class MinesweeperAI:
             if they can be inferred from existing knowledge
         """
         self.moves_made.add(cell)  # 1)
+        self.moves_mask |= self.grid.bit(cell)
         self.mark_safe(cell)  # 2)
-        self.add_sentence_to_knowledge(self.surrounding_cells(cell), count)  # 3)
-        self.try_to_eliminate_sentences_recursively()  # 4), 5)
+        neighbors = self.grid.neighbors[self.grid.index[cell]]
+        self.add_sentence_to_knowledge(neighbors, count)  # 3)
+        self.propagate()  # 4), 5)
 
     # TODO
-    def add_sentence_to_knowledge(self, cells, count):
-        filtered_cells = self.known_cells_removed(cells)
+    def add_sentence_to_knowledge(self, mask, count):
+        filtered_mask = mask & ~self.known_mask
 
         # subtract from count the # of mines removed by filtering cells
-        count -= len(cells & self.mines)
+        count -= (mask & self.mine_mask).bit_count()
 
-        new_sentence = Sentence(filtered_cells, count)
-        if new_sentence not in self.knowledge:
-            self.knowledge.append(new_sentence)
+        new_sentence = Sentence(filtered_mask, count, self.grid)
+        if self.knowledge.add(new_sentence):
+            self.pending.append(new_sentence)
 
-    # TODO
-    def try_to_eliminate_sentences_recursively(self, some_left=True):
+    def propagate(self):
         """
         4) mark any additional cells as safe or as mines
         if it can be concluded based on the AI's knowledge base
-        """
-        # exit recursion if we made no changes in the last cycle
-        if not some_left:
-            return
-
-        some_left = False
-        for sentence in self.knowledge:
-            if sentence.count == 0 and len(sentence.cells) > 0:
-                # mark cells as safes
-                for cell in sentence.cells.copy():
-                    self.mark_safe(cell)
-                # continue inner recursion, assume there's more to eliminate
-                return self.try_to_eliminate_sentences_recursively(some_left=True)
-            if sentence.count > 0 and sentence.count == len(sentence.cells):
-                # mark cells as mines
-                for cell in sentence.cells.copy():
-                    self.mark_mine(cell)
-                # continue inner recursion, assume there's more to eliminate
-                return self.try_to_eliminate_sentences_recursively(some_left=True)
-
-        self.prune_knowledge()
-
-        # continue outer recursion based on pared down knowledge
-        self.try_to_infer_new_knowledge()
-
-    # TODO
-    def try_to_infer_new_knowledge(self):
-        """
         5) add any new sentences to the AI's knowledge base
         if they can be inferred from existing knowledge
-        """
-        # nothing to infer if only one sentence in knowledge
-        if len(self.knowledge) < 2:
-            return
 
-        # check each pair of sentences in knowledge subsets, add new knowledge
-        new_knowledge = []
-        for sent_A, sent_B in itertools.combinations(self.knowledge, 2):
-            if sent_A == sent_B:
+        Works through the sentences added or changed since the last pass,
+        queueing the sentences that each deduction adds or changes in turn.
+        """
+        while self.pending:
+            sentence = self.pending.popleft()
+            if not self.knowledge.stored(sentence):
                 continue
 
-            # check for info to construct a new sentence
-            cells, count = None, None
-            if sent_B.cells.issubset(sent_A.cells):
-                cells = self.known_cells_removed(sent_A.cells - sent_B.cells)
-                count = sent_A.count - sent_B.count
-            if sent_A.cells.issubset(sent_B.cells):
-                cells = self.known_cells_removed(sent_B.cells - sent_A.cells)
-                count = sent_B.count - sent_A.count
-            if not cells:
+            # all cells are safe, or all are mines
+            if sentence.count == 0:
+                for cell in sentence.cells:
+                    self.mark_safe(cell)
+                continue
+            if sentence.count == len(sentence):
+                for cell in sentence.cells:
+                    self.mark_mine(cell)
                 continue
 
-            # got info needed, so add new sentence to knowledge
-            new_sentence = Sentence(cells, count)
-            if new_sentence not in self.knowledge:
-                new_knowledge.append(new_sentence)
-
-        # exit this recursion phase if nothing could be inferred
-        if new_knowledge == []:
-            return
-
-        # new knowledge found, so add it to knowledge
-        self.knowledge += new_knowledge
-
-        # continue outer recursion based on updated knowledge
-        return self.try_to_eliminate_sentences_recursively()
+            # a subset's cells and mines can be taken out of its superset,
+            # and only sentences sharing a cell can be subsets
+            mask = sentence.mask
+            for other in self.knowledge.overlapping(sentence):
+                if not other.mask & ~mask:
+                    inferred = Sentence(
+                        mask & ~other.mask, sentence.count - other.count, self.grid
+                    )
+                elif not mask & ~other.mask:
+                    inferred = Sentence(
+                        other.mask & ~mask, other.count - sentence.count, self.grid
+                    )
+                else:
+                    continue
+                if self.knowledge.add(inferred):
+                    self.pending.append(inferred)
 
     # TODO
     def surrounding_cells(self, cell):
         """
         Returns an array of nearby cells.
         """
-        # record cells within 1 row and col of cell, excluding cell
-        all_surrounding_cells = set()
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
-                if (i, j) == cell:
-                    continue
-
-                # if this is a valid cell, add it to the return value
-                if 0 <= i < self.height and 0 <= j < self.width:
-                    all_surrounding_cells.add((i, j))
-
-        return all_surrounding_cells
+        return set(self.grid.cells_of(self.grid.neighbors[self.grid.index[cell]]))
 
     # TODO
     def known_cells_removed(self, cells):
         """Return `cells` with known safes and mines removed"""
-        return cells - (self.safes | self.mines)
-
-    # TODO
-    def prune_knowledge(self):
-        """Remove empty sentences and duplicates from knowledge"""
-        # remove empty sentences
-        knowledge_copy = self.knowledge.copy()
-        for sentence in self.knowledge:
-            if 0 == len(sentence.cells):
-                knowledge_copy.remove(sentence)
-
-        # remove duplicates
-        no_duplicates = []
-        for sentence in knowledge_copy:
-            if sentence not in no_duplicates:
-                no_duplicates.append(sentence)
-
-        self.knowledge = no_duplicates
+        return set(self.grid.cells_of(self.grid.mask(cells) & ~self.known_mask))
 
     # TODO
     def make_safe_move(self):
@@ -338,8 +592,10 @@ class MinesweeperAI:
         This function may use the knowledge in self.mines, self.safes
         and self.moves_made, but should not modify any of those values.
         """
-        safe_moves = list(self.safes - self.moves_made)
-        return safe_moves[0] if len(safe_moves) > 0 else None
+        safe_moves = self.known_mask & ~self.mine_mask & ~self.moves_mask
+        if not safe_moves:
+            return None
+        return self.grid.cell_at[(safe_moves & -safe_moves).bit_length() - 1]
 
     # TODO
     def make_random_move(self):
@@ -348,6 +604,133 @@ class MinesweeperAI:
         Should choose randomly among cells that:
             1) have not already been chosen, and
             2) are not known to be mines
+
+        Chooses the cell least likely to be a mine, breaking ties in favor
+        of cells with fewer neighbors, which are likelier to have none.
+        """
+        frontier, interior, interior_risk = self.mine_risk()
+        if not frontier and not interior:
+            return None
+        lowest = min(frontier.values(), default=1)
+        if interior:
+            lowest = min(lowest, interior_risk)
+        for k in self.grid.by_neighbors:
+            cell = self.grid.cell_at[k]
+            if cell in frontier:
+                risk = frontier[cell]
+            elif interior >> k & 1:
+                risk = interior_risk
+            else:
+                continue
+            if risk <= lowest + 1e-12:
+                return cell
+
+    def components(self):
+        """
+        Splits the knowledge base into groups of sentences that share no
+        cells with other groups, and returns `(cells, sentences)` for each,
+        with the cells in breadth-first order through shared sentences.
+        """
+        groups = []
+        seen = 0
+        for start in sorted(self.knowledge.by_cell):
+            if seen >> start & 1:
+                continue
+            seen |= 1 << start
+            cells, sentences, keys = [], [], set()
+            queue = deque([start])
+            while queue:
+                k = queue.popleft()
+                cells.append(self.grid.cell_at[k])
+                for sentence in self.knowledge.at(k):
+                    key = Knowledge.key(sentence)
+                    if key in keys:
+                        continue
+                    keys.add(key)
+                    sentences.append(sentence)
+                    queue.extend(bits(sentence.mask & ~seen))
+                    seen |= sentence.mask
+            groups.append((cells, sentences))
+        return groups
+
+    def mine_probabilities(self):
+        """
+        Returns the probability that each cell not known to be safe or a
+        mine is a mine, counting every arrangement of the remaining mines
+        that agrees with the knowledge base as equally likely.
+        """
+        frontier, interior, interior_risk = self.mine_risk()
+        probabilities = dict.fromkeys(self.grid.cells_of(interior), interior_risk)
+        probabilities.update(frontier)
+        return probabilities
+
+    def mine_risk(self):
+        """
+        Returns `(frontier, interior, interior_risk)`: the probability that
+        each cell mentioned in the knowledge base is a mine, the mask of
+        the other cells not known to be safe or mines, and the probability
+        that any one of those is a mine, as for mine_probabilities().
+
+        Each group of sentences sharing cells is counted on its own by
+        number of mines, and the groups are combined with the ways to put
+        the rest of the mines in the cells no sentence mentions.
+        """
+        frontier_mask = 0
+        for k in self.knowledge.by_cell:
+            frontier_mask |= 1 << k
+        interior = self.grid.all & ~self.known_mask & ~frontier_mask
+        cells = interior.bit_count()
+        groups = [count_arrangements(*group) for group in self.components()]
+        remaining = self.total_mines - len(self.mines)
+
+        def weight(t):
+            """Ways to place the mines not in the groups' cells."""
+            rest = remaining - t
+            return math.comb(cells, rest) if 0 <= rest <= cells else 0
+
+        combined = {0: 1}
+        for total, _ in groups:
+            combined = convolve(combined, total)
+        everything = sum(ways * weight(t) for t, ways in combined.items())
+        if everything == 0:
+            # the mine count does not fit the knowledge, so ignore it
+            return self.local_risk(groups, interior)
+
+        frontier = dict()
+        for index, (total, mine) in enumerate(groups):
+            others = {0: 1}
+            for other, (other_total, _) in enumerate(groups):
+                if other != index:
+                    others = convolve(others, other_total)
+            ways_given = {
+                t: sum(ways * weight(t + u) for u, ways in others.items())
+                for t in total
+            }
+            for cell, polynomial in mine.items():
+                frontier[cell] = (
+                    sum(ways * ways_given[t] for t, ways in polynomial.items())
+                    / everything
+                )
+
+        interior_risk = 0
+        if cells:
+            expected = sum(
+                ways * weight(t) * (remaining - t) for t, ways in combined.items()
+            )
+            interior_risk = expected / everything / cells
+        return frontier, interior, interior_risk
+
+    def local_risk(self, groups, interior):
+        """
+        Returns mine probabilities like mine_risk(), but with each group's
+        arrangements counted as equally likely whatever their number of
+        mines, and the overall density for the other cells.
         """
-        avail_moves = list(self.known_cells_removed(self.all_cells))
-        return avail_moves[0] if len(avail_moves) > 0 else None
+        frontier = dict()
+        for total, mine in groups:
+            arrangements = sum(total.values())
+            for cell, polynomial in mine.items():
+                frontier[cell] = sum(polynomial.values()) / arrangements
+        unknown = (self.grid.all & ~self.known_mask).bit_count()
+        density = max(self.total_mines - len(self.mines), 0) / max(unknown, 1)
+        return frontier, interior, min(density, 1)
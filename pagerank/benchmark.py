@@ -0,0 +1,310 @@
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from pagerank import (
+    DAMPING,
+    crawl,
+    iterate_pagerank,
+    personalized_pagerank,
+    sample_pagerank,
+)
+
+SIZES = [50, 200]
+SAMPLES = 10000
+VECTORS = 100
+SEED_SET_SIZE = 3
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+    <head>
+        <title>{title}</title>
+    </head>
+    <body>
+        <h1>{title}</h1>
+
+        <div>Links:</div>
+        <ul>
+{links}
+        </ul>
+    </body>
+</html>
+"""
+LINK_TEMPLATE = '            <li><a href="{href}">{title}</a></li>'
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark pagerank.py on generated and crawled corpora."
+    )
+    parser.add_argument("corpora", nargs="*", help="extra corpus directories")
+    parser.add_argument("--sizes", nargs="+", type=int, default=SIZES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--samples", type=int, default=SAMPLES)
+    parser.add_argument("--vectors", type=int, default=VECTORS)
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = run_suite(args.sizes, args.seed, args.samples, args.vectors, args.corpora)
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+def page_name(i: int) -> str:
+    return f"{i}.html"
+
+
+def power_law_corpus(n: int, seed: int, links: int = 3) -> dict[str, set[str]]:
+    """
+    Return a corpus of `n` pages grown by preferential attachment: each new
+    page links to `links` earlier pages, picked in proportion to how many
+    links they already receive, so in-degrees follow a power law.
+    """
+    rng = random.Random(seed)
+    corpus = {page_name(0): set()}
+    # every page appears once per link it receives, plus once to be reachable
+    targets = [0]
+    for i in range(1, n):
+        chosen = set(rng.choice(targets) for _ in range(min(links, i)))
+        corpus[page_name(i)] = set(page_name(j) for j in chosen)
+        targets.extend(chosen)
+        targets.append(i)
+    return corpus
+
+
+def web_corpus(
+    n: int, seed: int, links: int = 5, copy_probability: float = 0.6
+) -> dict[str, set[str]]:
+    """
+    Return a web-like corpus of `n` pages built with the copying model:
+    each new page picks an earlier prototype page and, for each of its
+    `links` links, copies one of the prototype's links with probability
+    `copy_probability` or links to a uniformly random earlier page
+    otherwise. Earlier pages also link back to newer ones now and then,
+    so the graph has cycles as well as hubs.
+    """
+    rng = random.Random(seed)
+    corpus = {page_name(0): set()}
+    for i in range(1, n):
+        prototype = corpus[page_name(rng.randrange(i))]
+        new_links = set()
+        for _ in range(min(links, i)):
+            if prototype and rng.random() < copy_probability:
+                new_links.add(rng.choice(sorted(prototype)))
+            else:
+                new_links.add(page_name(rng.randrange(i)))
+        corpus[page_name(i)] = new_links
+        if rng.random() < 0.3:
+            corpus[page_name(rng.randrange(i))].add(page_name(i))
+    return corpus
+
+
+def dangling_corpus(
+    n: int, seed: int, links: int = 4, dangling_fraction: float = 0.5
+) -> dict[str, set[str]]:
+    """
+    Return a corpus of `n` pages where roughly `dangling_fraction` of the
+    pages have no outgoing links and the rest link to `links` random pages.
+    """
+    rng = random.Random(seed)
+    corpus = {}
+    for i in range(n):
+        if rng.random() < dangling_fraction:
+            corpus[page_name(i)] = set()
+            continue
+        others = [j for j in rng.sample(range(n), min(links + 1, n)) if j != i]
+        corpus[page_name(i)] = set(page_name(j) for j in others[:links])
+    return corpus
+
+
+GENERATORS = {
+    "power_law": power_law_corpus,
+    "web": web_corpus,
+    "dangling": dangling_corpus,
+}
+
+
+def write_corpus(corpus: dict[str, set[str]], directory: str):
+    """
+    Write `corpus` to `directory` as one HTML file per page, in the same
+    format as the hand-written corpora, so that `crawl` can read it back.
+    """
+    os.makedirs(directory, exist_ok=True)
+    for page, links in corpus.items():
+        title = page.removesuffix(".html")
+        link_lines = "\n".join(
+            LINK_TEMPLATE.format(href=link, title=link.removesuffix(".html"))
+            for link in sorted(links)
+        )
+        with open(os.path.join(directory, page), "w") as f:
+            f.write(PAGE_TEMPLATE.format(title=title, links=link_lines))
+
+
+def exact_pagerank(
+    corpus: dict[str, set[str]], damping_factor: float
+) -> dict[str, float]:
+    """
+    Return reference PageRank values, solved directly rather than iterated
+    so they do not depend on any of the functions being benchmarked.
+
+    The ranks x satisfy (I - dM)x = (1 - d)/N, where M[j][i] is the chance
+    of following a link from page i to page j (1/N for every j when i has
+    no links). The system is solved by Gaussian elimination with partial
+    pivoting.
+    """
+    pages = sorted(corpus)
+    n = len(pages)
+    position = {pg: i for i, pg in enumerate(pages)}
+
+    # augmented matrix [I - dM | (1 - d)/N], one list per equation
+    rows = [[0.0] * n + [(1 - damping_factor) / n] for _ in range(n)]
+    for i, pg in enumerate(pages):
+        links = [position[link] for link in corpus[pg]] or range(n)
+        share = damping_factor / len(links)
+        for j in links:
+            rows[j][i] -= share
+        rows[i][i] += 1
+
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(rows[r][col]))
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+        pivot_row = rows[col]
+        for r in range(col + 1, n):
+            factor = rows[r][col] / pivot_row[col]
+            if factor:
+                rows[r] = [a - factor * b for a, b in zip(rows[r], pivot_row)]
+
+    ranks = [0.0] * n
+    for i in reversed(range(n)):
+        total = rows[i][n] - sum(rows[i][j] * ranks[j] for j in range(i + 1, n))
+        ranks[i] = total / rows[i][i]
+    return dict(zip(pages, ranks))
+
+
+def errors(ranks: dict[str, float], exact: dict[str, float]) -> dict[str, float]:
+    """
+    Return the largest absolute and the total (L1) error of `ranks`.
+    """
+    diffs = [abs(ranks.get(pg, 0) - exact[pg]) for pg in exact]
+    return {"max_error": max(diffs), "l1_error": sum(diffs)}
+
+
+def measure(function, *args, seed: int = 0) -> tuple[dict, object]:
+    """
+    Call `function(*args)` once for wall time and once more under
+    tracemalloc for peak memory, re-seeding `random` before each call.
+    Return both measurements along with the return value of the timed
+    call (or the error it raised).
+    """
+    random.seed(seed)
+    start = time.perf_counter()
+    try:
+        value = function(*args)
+    except Exception as e:
+        return {"error": repr(e)}, e
+    seconds = time.perf_counter() - start
+
+    random.seed(seed)
+    tracemalloc.start()
+    function(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": seconds, "peak_kib": peak / 1024}, value
+
+
+def benchmark_corpus(
+    corpus: dict[str, set[str]], directory: str, seed: int, samples: int, vectors: int
+) -> dict[str, dict]:
+    """
+    Return time, memory and accuracy results for each pagerank.py function
+    on `corpus`, which must already be written to `directory`.
+    """
+    exact = exact_pagerank(corpus, DAMPING)
+    results = {}
+
+    stats, crawled = measure(crawl, directory)
+    if "error" not in stats:
+        stats["matches_corpus"] = crawled == corpus
+    results["crawl"] = stats
+
+    stats, ranks = measure(sample_pagerank, corpus, DAMPING, samples, seed=seed)
+    if "error" not in stats:
+        stats.update(errors(ranks, exact))
+    results["sample_pagerank"] = stats
+
+    stats, ranks = measure(iterate_pagerank, corpus, DAMPING)
+    if "error" not in stats:
+        stats.update(errors(ranks, exact))
+    results["iterate_pagerank"] = stats
+
+    teleports = random_seed_sets(corpus, vectors, seed=seed)
+    stats, _ = measure(personalized_pagerank, corpus, DAMPING, teleports)
+    if "error" not in stats:
+        stats["vectors_per_second"] = vectors / stats["seconds"]
+        uniform = {pg: 1 for pg in corpus}
+        ranks = personalized_pagerank(corpus, DAMPING, [uniform])[0]
+        stats.update(errors(ranks, exact))
+    results["personalized_pagerank"] = stats
+
+    return results
+
+
+def run_suite(
+    sizes: list[int], seed: int, samples: int, vectors: int, corpora: list[str] = ()
+) -> dict:
+    """
+    Return a machine-readable report of every generated graph at every
+    size, plus each directory in `corpora`.
+    """
+    report = {
+        "config": {
+            "damping": DAMPING,
+            "samples": samples,
+            "seed": seed,
+            "sizes": sizes,
+            "vectors": vectors,
+            "python": sys.version.split()[0],
+        },
+        "results": {},
+    }
+    with tempfile.TemporaryDirectory() as root:
+        for name, generate in GENERATORS.items():
+            for size in sizes:
+                corpus = generate(size, seed)
+                directory = os.path.join(root, f"{name}_{size}")
+                write_corpus(corpus, directory)
+                results = benchmark_corpus(corpus, directory, seed, samples, vectors)
+                report["results"][f"{name}/{size}"] = results
+
+    for directory in corpora:
+        corpus = crawl(directory)
+        results = benchmark_corpus(corpus, directory, seed, samples, vectors)
+        report["results"][os.path.basename(os.path.normpath(directory))] = results
+
+    return report
+
+
+def random_seed_sets(
+    corpus: dict[str, set[str]], n: int, size: int = SEED_SET_SIZE, seed: int = 0
+) -> list[dict[str, float]]:
+    """
+    Return `n` teleport vectors, each putting equal weight on a random
+    seed set of up to `size` pages from `corpus`.
+    """
+    rng = random.Random(seed)
+    pages = sorted(corpus)
+    size = min(size, len(pages))
+    return [{pg: 1 for pg in rng.sample(pages, size)} for _ in range(n)]
+
+
+if __name__ == "__main__":
+    main()
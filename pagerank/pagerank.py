@@ -1,3 +1,4 @@
+import math
 import os
 import random
 import re
@@ -67,7 +68,9 @@ def transition_model(
     num_links_on_page = len(linked_pages)
     if num_links_on_page == 0:
         transitions: dict[str, float] = {pg: 1 / num_all_pages for pg in all_pages}
-        assert sum(transitions.values()) == 1, "Probabilities don't sum to 1!"
+        assert math.isclose(
+            sum(transitions.values()), 1
+        ), "Probabilities don't sum to 1!"
         return transitions
 
     # first, get all the pages from corpus and put them in transitions
@@ -81,7 +84,7 @@ def transition_model(
     for page in all_pages:
         transitions[page] += (1 - damping_factor) / num_all_pages
 
-    assert sum(transitions.values()) == 1, "Probabilities don't sum to 1!"
+    assert math.isclose(sum(transitions.values()), 1), "Probabilities don't sum to 1!"
     return transitions
 
 
@@ -209,5 +212,102 @@ def iterate_pagerank(
             return page_ranks
 
 
+def corpus_index(
+    corpus: dict[str, set[str]],
+) -> tuple[list[str], list[tuple[int, ...]], list[int]]:
+    """
+    Return a positional index of `corpus` that can be shared by any number
+    of rank vectors.
+
+    The index is a tuple of `(pages, outlinks, dangling)` where `pages` is
+    the sorted list of page names, `outlinks[i]` holds the positions of the
+    pages linked to by `pages[i]`, and `dangling` lists the positions of
+    pages with no outgoing links.
+    """
+    pages = sorted(corpus)
+    position = {pg: i for i, pg in enumerate(pages)}
+    outlinks = [tuple(sorted(position[link] for link in corpus[pg])) for pg in pages]
+    dangling = [i for i, links in enumerate(outlinks) if not links]
+    return pages, outlinks, dangling
+
+
+def personalized_pagerank(
+    corpus: dict[str, set[str]],
+    damping_factor: float,
+    teleports: list[dict[str, float]],
+    margin: float = CONVERGENCE_MARGIN,
+    index=None,
+) -> list[dict[str, float]]:
+    """
+    Return one personalized PageRank dictionary per teleport vector in
+    `teleports`, solving all of them together by power iteration.
+
+    Each teleport vector maps pages to non-negative weights (e.g. a seed set
+    of pages with weight 1 each); weights are normalized to sum to 1 and
+    missing pages get weight 0. With probability `1 - damping_factor` the
+    surfer jumps according to the teleport vector instead of uniformly, and
+    pages with no links also hand their rank out by the teleport vector.
+    A uniform teleport vector reproduces `iterate_pagerank`.
+
+    The rank vectors form the columns of a dense matrix that is multiplied
+    by the sparse link matrix once per iteration, so the corpus index
+    (`corpus_index(corpus)`, or `index` if given) is walked once per
+    iteration for the whole batch rather than once per vector. A vector
+    stops being updated once no rank in it moves by more than `margin`.
+    """
+    pages, outlinks, dangling = index or corpus_index(corpus)
+    page_count = len(pages)
+    position = {pg: i for i, pg in enumerate(pages)}
+
+    # build the dense teleport matrix, one normalized row per vector
+    jumps: list[list[float]] = []
+    for teleport in teleports:
+        row = [0.0] * page_count
+        for pg, weight in teleport.items():
+            if weight < 0:
+                raise ValueError("Teleport weights must be non-negative.")
+            row[position[pg]] += weight
+        total = sum(row)
+        if total == 0:
+            raise ValueError("Teleport vector must have a positive weight.")
+        jumps.append([weight / total for weight in row])
+
+    # every vector starts from its own teleport distribution
+    ranks = [row.copy() for row in jumps]
+    active = list(range(len(jumps)))
+    while active:
+        # teleport and dangling mass both follow each vector's teleport row
+        new_ranks = {}
+        for v in active:
+            rank_v = ranks[v]
+            dangling_mass = sum(rank_v[i] for i in dangling)
+            scale = (1 - damping_factor) + damping_factor * dangling_mass
+            new_ranks[v] = [scale * weight for weight in jumps[v]]
+
+        # sparse x dense product, walking the shared link index once
+        for i, targets in enumerate(outlinks):
+            if not targets:
+                continue
+            share = damping_factor / len(targets)
+            for v in active:
+                contribution = ranks[v][i] * share
+                if contribution == 0:
+                    continue
+                new_rank_v = new_ranks[v]
+                for j in targets:
+                    new_rank_v[j] += contribution
+
+        # retire vectors that have converged
+        still_active = []
+        for v in active:
+            change = max(abs(new - old) for new, old in zip(new_ranks[v], ranks[v]))
+            ranks[v] = new_ranks[v]
+            if change > margin:
+                still_active.append(v)
+        active = still_active
+
+    return [dict(zip(pages, rank_v)) for rank_v in ranks]
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,287 @@
+"""
+Tic Tac Toe search benchmarks
+"""
+
+import time
+
+import bitboard
+import book
+import mnk
+import tictactoe as ttt
+
+MNK_GAMES = [(4, 4, 4), (5, 5, 4), (15, 15, 5)]
+
+
+def main():
+    # every search below is measured, so the book must not answer for it
+    ttt.USE_OPENING_BOOK = False
+
+    print("Transposition table")
+    for use_table in (False, True):
+        table_report(use_table)
+
+    print("Alpha-beta pruning")
+    alpha_beta_report()
+
+    print("Bitboards")
+    bitboard_report()
+
+    print("Symmetry reduction")
+    for use_table in (False, True):
+        symmetry_report(use_table)
+
+    print("Incremental state")
+    incremental_report()
+
+    print("Opening book")
+    book_report()
+
+    print("m,n,k games")
+    for m, n, k in MNK_GAMES:
+        mnk_report(m, n, k)
+
+
+def search(board, engine=None):
+    """
+    Returns the move `engine` (minimax() by default) makes on the board,
+    the nodes it visited and the seconds it took.
+    """
+    engine = engine or ttt.minimax
+    ttt.nodes_visited = 0
+    start = time.perf_counter()
+    move = engine(board)
+    return move, ttt.nodes_visited, time.perf_counter() - start
+
+
+def openings():
+    """
+    Returns the empty board and every board after X's first move.
+    """
+    empty = ttt.initial_state()
+    return [("empty", empty)] + [
+        (f"X at {action}", ttt.result(empty, action))
+        for action in sorted(ttt.actions(empty))
+    ]
+
+
+def value_after(board, move):
+    """
+    Returns the minimax value of playing `move` on the board.
+    """
+    after = ttt.result(board, move)
+    return ttt.max_value(after) if ttt.player(after) == ttt.X else ttt.min_value(after)
+
+
+def play_game(moves):
+    """
+    Plays `moves` (a list of actions) from the initial state, then lets
+    minimax() play both sides to the end, returning the nodes visited and
+    seconds taken by every search.
+    """
+    board = ttt.initial_state()
+    for move in moves:
+        board = ttt.result(board, move)
+
+    searches = []
+    while not ttt.terminal(board):
+        move, nodes, seconds = search(board)
+        searches.append((nodes, seconds))
+        board = ttt.result(board, move)
+    return searches
+
+
+def table_report(use_table):
+    """
+    Prints the nodes visited and per-move latency of a whole self-play
+    game from the empty board, searching lists without symmetry reduction,
+    with or without the transposition table, which is kept between moves
+    as runner.py does.
+    """
+    ttt.USE_TRANSPOSITION_TABLE = use_table
+    ttt.USE_INCREMENTAL_STATE = False
+    ttt.USE_SYMMETRY = False
+    ttt.clear_transposition_table()
+    searches = play_game([])
+    ttt.USE_INCREMENTAL_STATE = True
+    ttt.USE_SYMMETRY = True
+    print(f"    {'with' if use_table else 'without'} table")
+    for turn, (nodes, seconds) in enumerate(searches):
+        print(f"        move {turn + 1}: {nodes:>7} nodes, {seconds * 1000:9.2f} ms")
+    total_nodes = sum(nodes for nodes, _ in searches)
+    total_seconds = sum(seconds for _, seconds in searches)
+    print(f"        total:  {total_nodes:>7} nodes, {total_seconds * 1000:9.2f} ms")
+
+
+def alpha_beta_report():
+    """
+    Prints the nodes visited by minimax() and alpha_beta() from every
+    opening position, searching lists without the transposition table or
+    symmetry reduction, and checks that both choose moves of the same
+    value.
+    """
+    ttt.USE_INCREMENTAL_STATE = False
+    ttt.USE_SYMMETRY = False
+    for name, board in openings():
+        ttt.USE_TRANSPOSITION_TABLE = False
+        full_move, full_nodes, full_seconds = search(board, ttt.minimax)
+        pruned_move, pruned_nodes, pruned_seconds = search(board, ttt.alpha_beta)
+
+        ttt.USE_TRANSPOSITION_TABLE = True
+        if value_after(board, full_move) != value_after(board, pruned_move):
+            raise AssertionError(f"{name}: alpha_beta() move is not optimal")
+        print(
+            f"    {name:<12} minimax {full_nodes:>7} nodes {full_seconds * 1000:9.2f} ms,"
+            f" alpha_beta {pruned_nodes:>5} nodes {pruned_seconds * 1000:7.2f} ms"
+        )
+    ttt.USE_INCREMENTAL_STATE = True
+    ttt.USE_SYMMETRY = True
+
+
+def bitboard_report():
+    """
+    Prints the nodes per second searched by minimax() on lists, without
+    symmetry reduction, and by the bitboard engine from every board after
+    X's first move, without either transposition table, and checks that
+    both choose moves of the same value.
+    """
+    ttt.USE_INCREMENTAL_STATE = False
+    ttt.USE_SYMMETRY = False
+    for name, board in openings()[1:]:
+        ttt.USE_TRANSPOSITION_TABLE = False
+        bitboard.USE_TRANSPOSITION_TABLE = False
+        list_move, list_nodes, list_seconds = search(board)
+        bitboard.nodes_visited = 0
+        start = time.perf_counter()
+        bit_move = bitboard.minimax(board)
+        bit_seconds = time.perf_counter() - start
+        bit_nodes = bitboard.nodes_visited
+
+        ttt.USE_TRANSPOSITION_TABLE = True
+        bitboard.USE_TRANSPOSITION_TABLE = True
+        if value_after(board, list_move) != value_after(board, bit_move):
+            raise AssertionError(f"{name}: bitboard move is not optimal")
+        print(
+            f"    {name:<12} lists {list_nodes / list_seconds:>9.0f} nodes/s,"
+            f" bitboards {bit_nodes / bit_seconds:>9.0f} nodes/s"
+        )
+    ttt.USE_INCREMENTAL_STATE = True
+    ttt.USE_SYMMETRY = True
+
+
+def symmetry_report(use_table):
+    """
+    Prints the nodes visited by minimax(), searching a State, from the empty
+    board and every board after X's first move with and without symmetry
+    reduction, with a fresh transposition table per search or none, and
+    checks that both choose moves of the same value.
+    """
+    print(f"    {'with' if use_table else 'without'} table")
+    ttt.USE_TRANSPOSITION_TABLE = use_table
+    for name, board in openings():
+        results = []
+        for use_symmetry in (False, True):
+            ttt.USE_SYMMETRY = use_symmetry
+            ttt.clear_transposition_table()
+            results.append(search(board))
+
+        ttt.USE_TRANSPOSITION_TABLE = True
+        (plain_move, plain_nodes, plain_seconds), (move, nodes, seconds) = results
+        if value_after(board, plain_move) != value_after(board, move):
+            raise AssertionError(f"{name}: symmetric search move is not optimal")
+        ttt.USE_TRANSPOSITION_TABLE = use_table
+        print(
+            f"        {name:<12} {plain_nodes:>7} nodes {plain_seconds * 1000:9.2f} ms,"
+            f" symmetric {nodes:>6} nodes {seconds * 1000:8.2f} ms"
+            f" ({plain_nodes / nodes:.1f}x fewer, {plain_seconds / seconds:.1f}x faster)"
+        )
+    ttt.USE_TRANSPOSITION_TABLE = True
+
+
+def incremental_report():
+    """
+    Prints the time per node of minimax() without the transposition table
+    or symmetry reduction, searching lists with player(), actions(),
+    result() and terminal() or searching a State, from the boards after
+    X's first move in a corner, on an edge and in the center.
+    """
+    ttt.USE_TRANSPOSITION_TABLE = False
+    ttt.USE_SYMMETRY = False
+    for name, board in openings():
+        if name not in ("X at (0, 0)", "X at (0, 1)", "X at (1, 1)"):
+            continue
+        results = []
+        for use_state in (False, True):
+            ttt.USE_INCREMENTAL_STATE = use_state
+            results.append(search(board))
+
+        (list_move, list_nodes, list_seconds), (move, nodes, seconds) = results
+        if value_after(board, list_move) != value_after(board, move):
+            raise AssertionError(f"{name}: State search move is not optimal")
+        print(
+            f"    {name:<12} {list_nodes:>6} nodes,"
+            f" lists {list_seconds / list_nodes * 1e6:6.2f} us/node,"
+            f" State {seconds / nodes * 1e6:6.2f} us/node"
+        )
+    ttt.USE_TRANSPOSITION_TABLE = True
+    ttt.USE_SYMMETRY = True
+
+
+def book_report():
+    """
+    Prints the time taken to build the opening book and the latency of
+    minimax() from every opening position when it answers from the book
+    and when it searches with a fresh transposition table.
+    """
+    start = time.perf_counter()
+    entries = book.build()
+    solved = sum(entry != book.UNREACHABLE for entry in entries)
+    print(
+        f"    built {solved} positions, {len(entries)} bytes,"
+        f" in {(time.perf_counter() - start) * 1000:.2f} ms"
+    )
+
+    for name, board in openings():
+        ttt.USE_OPENING_BOOK = False
+        ttt.clear_transposition_table()
+        searched, _, search_seconds = search(board)
+
+        ttt.USE_OPENING_BOOK = True
+        booked, _, book_seconds = search(board)
+
+        ttt.USE_OPENING_BOOK = False
+        if value_after(board, searched) != value_after(board, booked):
+            raise AssertionError(f"{name}: book move is not optimal")
+        print(
+            f"    {name:<12} search {search_seconds * 1000:9.2f} ms,"
+            f" book {book_seconds * 1e6:7.2f} us"
+        )
+
+
+def mnk_report(m, n, k, budget=0.5):
+    """
+    Prints the latency, search depth and nodes per second of every move in
+    a self-play m,n,k game with `budget` seconds per move.
+    """
+    game = mnk.Game(m, n, k, budget)
+    board = game.initial_state()
+    latencies, depths, nodes = [], [], 0
+    while not game.terminal(board):
+        searcher = mnk.Search(game, board)
+        start = time.perf_counter()
+        cell = searcher.best_cell(budget)
+        latencies.append(time.perf_counter() - start)
+        depths.append(searcher.depth)
+        nodes += searcher.nodes
+        board = game.result(board, divmod(cell, n))
+
+    winner = game.winner(board) or "nobody"
+    print(
+        f"    {m}x{n}-{k}: {len(latencies)} moves, {winner} wins,"
+        f" max latency {max(latencies) * 1000:.0f} ms,"
+        f" depth {min(depths)}-{max(depths)},"
+        f" {nodes / sum(latencies):.0f} nodes/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
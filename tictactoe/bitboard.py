@@ -0,0 +1,190 @@
+"""
+Tic Tac Toe bitboard engine
+
+A board is a pair of 9-bit masks, one for X's cells and one for O's, where
+cell (i, j) is bit 3 * i + j.
+"""
+
+import tictactoe as ttt
+
+FULL = (1 << 9) - 1
+WIN_MASKS = (
+    [0b111 << (3 * i) for i in range(3)]
+    + [0b001001001 << j for j in range(3)]
+    + [0b100010001, 0b001010100]
+)
+
+# search memoizes board values when this is True
+USE_TRANSPOSITION_TABLE = True
+
+# value of every position searched so far for the player to move, keyed
+# by the (X mask, O mask) pair
+transposition_table = {}
+
+# number of positions negamax() has been called on
+nodes_visited = 0
+
+
+def from_board(board):
+    """
+    Returns the (X mask, O mask) pair for a list-of-lists board.
+    """
+    x, o = 0, 0
+    for i, row in enumerate(board):
+        for j, cell in enumerate(row):
+            if cell == ttt.X:
+                x |= 1 << (3 * i + j)
+            elif cell == ttt.O:
+                o |= 1 << (3 * i + j)
+    return x, o
+
+
+def to_board(x, o):
+    """
+    Returns the list-of-lists board for an (X mask, O mask) pair.
+    """
+    return [
+        [
+            (
+                ttt.X
+                if x >> (3 * i + j) & 1
+                else ttt.O if o >> (3 * i + j) & 1 else ttt.EMPTY
+            )
+            for j in range(3)
+        ]
+        for i in range(3)
+    ]
+
+
+def won(mask):
+    """
+    Returns True if the cells in `mask` complete a line.
+    """
+    for win in WIN_MASKS:
+        if mask & win == win:
+            return True
+    return False
+
+
+class Bitboard:
+    """
+    A position as two masks, with O(1) move and undo. The player to move
+    is X when both players have placed the same number of marks.
+    """
+
+    __slots__ = ("masks", "history")
+
+    def __init__(self, x=0, o=0):
+        self.masks = [x, o]
+        self.history = []
+
+    def turn(self):
+        """
+        Returns 0 if X is to move, 1 if O is.
+        """
+        return int(self.masks[0].bit_count() > self.masks[1].bit_count())
+
+    def empty(self):
+        """
+        Returns the mask of empty cells.
+        """
+        return FULL ^ (self.masks[0] | self.masks[1])
+
+    def move(self, cell):
+        """
+        Places the current player's mark on `cell` (0-8).
+        """
+        self.masks[self.turn()] |= 1 << cell
+        self.history.append(cell)
+
+    def undo(self):
+        """
+        Takes back the last move.
+        """
+        bit = 1 << self.history.pop()
+        self.masks[0] &= ~bit
+        self.masks[1] &= ~bit
+
+    def winner(self):
+        """
+        Returns 0 if X has won, 1 if O has, None otherwise.
+        """
+        for side in (0, 1):
+            if won(self.masks[side]):
+                return side
+        return None
+
+    def key(self):
+        return self.masks[0], self.masks[1]
+
+
+def cells(mask):
+    """
+    Yields the index of every set bit in `mask`.
+    """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def negamax(bitboard):
+    """
+    Returns the value of the position for the player to move: 1 for a
+    forced win, 0 for a draw and -1 for a forced loss.
+    """
+    global nodes_visited
+    nodes_visited += 1
+
+    key = bitboard.key()
+    if USE_TRANSPOSITION_TABLE and key in transposition_table:
+        return transposition_table[key]
+
+    # only the player who just moved can have completed a line
+    mover = 1 - bitboard.turn()
+    empty = bitboard.empty()
+    if won(bitboard.masks[mover]):
+        value = -1
+    elif not empty:
+        value = 0
+    else:
+        value = -1
+        for cell in cells(empty):
+            bitboard.move(cell)
+            value = max(value, -negamax(bitboard))
+            bitboard.undo()
+            if value == 1:
+                break
+
+    if USE_TRANSPOSITION_TABLE:
+        transposition_table[key] = value
+    return value
+
+
+def best_move(bitboard):
+    """
+    Returns an optimal cell (0-8) for the player to move, or None if the
+    game is over.
+    """
+    mover = 1 - bitboard.turn()
+    empty = bitboard.empty()
+    if won(bitboard.masks[mover]) or not empty:
+        return None
+
+    best_cell, best_value = None, -2
+    for cell in cells(empty):
+        bitboard.move(cell)
+        value = -negamax(bitboard)
+        bitboard.undo()
+        if value > best_value:
+            best_cell, best_value = cell, value
+    return best_cell
+
+
+def minimax(board):
+    """
+    Returns the optimal action (i, j) for the current player on a
+    list-of-lists board, like tictactoe.minimax(), searching on bitboards.
+    """
+    cell = best_move(Bitboard(*from_board(board)))
+    return None if cell is None else divmod(cell, 3)
@@ -0,0 +1,136 @@
+"""
+Tic Tac Toe opening book
+
+Every reachable position is solved once, offline, by running this module,
+and written to book.bin as one byte per board, indexed by reading the
+board's cells as a base-3 number (EMPTY = 0, X = 1, O = 2, cell (i, j) is
+digit 3 * i + j). The low four bits of a byte hold the optimal cell
+3 * i + j (NO_MOVE once the game is over) and the high four bits hold the
+board's utility plus one. Boards that cannot arise in a game are
+UNREACHABLE.
+
+Only canonical boards (see tictactoe.canonical()) are stored; other boards
+are looked up by their canonical form, and the move found is mapped back
+onto them.
+"""
+
+import mmap
+import os
+
+import bitboard
+import tictactoe as ttt
+
+PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+SIZE = 3**9
+NO_MOVE = 9
+UNREACHABLE = 0xFF
+
+# memory map of the book file, opened on the first lookup
+table = None
+
+
+def index(x, o):
+    """
+    Returns the book index of the (X mask, O mask) pair.
+    """
+    total = 0
+    for cell in range(8, -1, -1):
+        total = total * 3 + (x >> cell & 1) + 2 * (o >> cell & 1)
+    return total
+
+
+def string_index(cells):
+    """
+    Returns the book index of a board given as a tictactoe.cell_string().
+    """
+    total = 0
+    for cell in reversed(cells):
+        total = total * 3 + (1 if cell == ttt.X else 2 if cell == ttt.O else 0)
+    return total
+
+
+def solve():
+    """
+    Returns the book as a bytearray, solving every canonical position
+    reachable from the empty board with the bitboard engine.
+    """
+    entries = bytearray([UNREACHABLE]) * SIZE
+    position = bitboard.Bitboard()
+    visited = set()
+
+    def visit():
+        i = index(*position.key())
+        if i in visited:
+            return
+        visited.add(i)
+
+        move = bitboard.best_move(position)
+        board = bitboard.to_board(*position.key())
+        if ttt.canonical(board)[0] == ttt.cell_string(board):
+            # negamax() values positions for the player to move; utility is X's
+            sign = -1 if position.turn() else 1
+            utility = sign * bitboard.negamax(position)
+            entries[i] = (utility + 1) << 4 | (NO_MOVE if move is None else move)
+
+        if move is not None:
+            for cell in bitboard.cells(position.empty()):
+                position.move(cell)
+                visit()
+                position.undo()
+
+    visit()
+    return entries
+
+
+def build(path=PATH):
+    """
+    Solves every position and writes the book to `path`.
+    """
+    global table
+    entries = solve()
+    with open(path, "wb") as f:
+        f.write(entries)
+    table = None
+    return entries
+
+
+def load(path=PATH):
+    """
+    Returns the memory-mapped book, or None if it has not been built.
+    """
+    global table
+    if table is None:
+        try:
+            with open(path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            return None
+        if len(mapped) != SIZE:
+            mapped.close()
+            return None
+        table = mapped
+    return table
+
+
+def lookup(board):
+    """
+    Returns the book's (action, utility) for the board, where action is
+    None once the game is over, or None if the book has not been built or
+    the board cannot arise in a game.
+    """
+    entries = load()
+    if entries is None:
+        return None
+    key, symmetry = ttt.canonical(board)
+    entry = entries[string_index(key)]
+    if entry == UNREACHABLE:
+        return None
+    move = entry & 0xF
+    action = None if move == NO_MOVE else divmod(symmetry[move], 3)
+    return action, (entry >> 4) - 1
+
+
+if __name__ == "__main__":
+    entries = build()
+    solved = sum(entry != UNREACHABLE for entry in entries)
+    print(f"Solved {solved} canonical positions into {PATH}")
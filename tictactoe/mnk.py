@@ -0,0 +1,355 @@
+"""
+m,n,k game player
+
+Two players take turns marking the cells of an m x n board, and the first
+to get k marks in a row, column or diagonal wins: Tic Tac Toe is the
+3,3,3 game and gomoku the 15,15,5 game. Game mirrors the functions of
+tictactoe.py for any m, n and k, with boards as lists of m rows of n
+cells, but its minimax() searches to a limited depth under a time budget.
+"""
+
+import time
+
+X = "X"
+O = "O"
+EMPTY = None
+
+# seconds minimax() may spend choosing a move
+BUDGET = 1.0
+
+# boards with at most this many cells search every empty cell
+SMALL = 25
+
+# score of a won position; wins sooner are scored higher
+WIN = 10**9
+
+
+class Timeout(Exception):
+    pass
+
+
+class Game:
+    """
+    The m,n,k game on `m` rows of `n` cells, won with `k` in a row.
+    """
+
+    def __init__(self, m, n, k, budget=BUDGET):
+        if not (1 <= k <= max(m, n)):
+            raise ValueError("k must be between 1 and the longer side")
+        self.m, self.n, self.k = m, n, k
+        self.budget = budget
+
+        # every run of k cells a player could win with, as flat indices
+        # i * n + j, and the runs through each cell
+        self.windows = []
+        for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            for i in range(m):
+                for j in range(n):
+                    end_i, end_j = i + di * (k - 1), j + dj * (k - 1)
+                    if 0 <= end_i < m and 0 <= end_j < n:
+                        self.windows.append(
+                            tuple((i + di * s) * n + j + dj * s for s in range(k))
+                        )
+        self.cell_windows = [[] for _ in range(m * n)]
+        for w, window in enumerate(self.windows):
+            for cell in window:
+                self.cell_windows[cell].append(w)
+
+        # cells within `reach` steps of each cell; search only considers
+        # moves near existing marks, except on small boards
+        reach = max(m, n) if m * n <= SMALL else 1
+        self.neighbors = [
+            [
+                a * n + b
+                for a in range(max(i - reach, 0), min(i + reach + 1, m))
+                for b in range(max(j - reach, 0), min(j + reach + 1, n))
+                if (a, b) != (i, j)
+            ]
+            for i in range(m)
+            for j in range(n)
+        ]
+
+        # a window holding c marks of one player and none of the other is
+        # worth weights[c] to that player
+        self.weights = [0] + [10 ** (c - 1) for c in range(1, k)] + [WIN]
+
+    def initial_state(self):
+        """
+        Returns starting state of the board.
+        """
+        return [[EMPTY] * self.n for _ in range(self.m)]
+
+    def player(self, board):
+        """
+        Returns player who has the next turn on a board.
+        """
+        if self.terminal(board):
+            return None
+        num_X = sum(row.count(X) for row in board)
+        num_O = sum(row.count(O) for row in board)
+        return O if num_X > num_O else X
+
+    def actions(self, board):
+        """
+        Returns set of all possible actions (i, j) available on the board.
+        """
+        if self.terminal(board):
+            return set()
+        return set(
+            (i, j) for i in range(self.m) for j in range(self.n) if board[i][j] == EMPTY
+        )
+
+    def result(self, board, action):
+        """
+        Returns the board that results from making move (i, j) on the board.
+        """
+        i, j = action
+        if not (0 <= i < self.m and 0 <= j < self.n):
+            raise IndexError("Move is off the board.")
+        if board[i][j] != EMPTY:
+            raise Exception("Invalid action. The cell is already occupied.")
+
+        new_board = [list(row) for row in board]
+        new_board[i][j] = self.player(board)
+        return new_board
+
+    def winner(self, board):
+        """
+        Returns the winner of the game, if there is one.
+        """
+        n = self.n
+        for window in self.windows:
+            first = board[window[0] // n][window[0] % n]
+            if first != EMPTY and all(
+                board[cell // n][cell % n] == first for cell in window
+            ):
+                return first
+        return None
+
+    def terminal(self, board):
+        """
+        Returns True if game is over, False otherwise.
+        """
+        if self.winner(board) is not None:
+            return True
+        return all(cell != EMPTY for row in board for cell in row)
+
+    def utility(self, board):
+        """
+        Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+        """
+        _winner = self.winner(board)
+        return 1 if _winner == X else -1 if _winner == O else 0
+
+    def minimax(self, board, cancel=None):
+        """
+        Returns the best action (i, j) for the current player on the board
+        found by iterative deepening within the game's time budget, or as
+        soon as `cancel` (a threading.Event, if given) is set.
+        """
+        if self.player(board) is None:
+            return None
+        cell = Search(self, board, cancel).best_cell(self.budget)
+        return divmod(cell, self.n)
+
+
+class Position:
+    """
+    A board as a flat list of cells (0 empty, 1 X, 2 O), with the number
+    of marks each player has in every window and the evaluation of the
+    board kept up to date as moves are made and undone.
+    """
+
+    def __init__(self, game, board):
+        self.game = game
+        self.cells = [0] * (game.m * game.n)
+        self.counts = ([0] * len(game.windows), [0] * len(game.windows))
+        self.marks = [0, 0]
+        self.history = []
+        self.won = None
+
+        # X's windows count for X (positively) and O's against
+        self.score = 0
+
+        for i, row in enumerate(board):
+            for j, cell in enumerate(row):
+                if cell != EMPTY:
+                    self.place(i * game.n + j, 0 if cell == X else 1)
+
+    def turn(self):
+        """
+        Returns 0 if X is to move, 1 if O is.
+        """
+        return int(self.marks[0] > self.marks[1])
+
+    def full(self):
+        return len(self.cells) == self.marks[0] + self.marks[1]
+
+    def window_score(self, w):
+        x, o = self.counts[0][w], self.counts[1][w]
+        if o == 0:
+            return self.game.weights[x]
+        if x == 0:
+            return -self.game.weights[o]
+        return 0
+
+    def place(self, cell, side):
+        """
+        Marks `cell` for `side` (0 for X, 1 for O), updating the windows
+        through it.
+        """
+        counts = self.counts[side]
+        for w in self.game.cell_windows[cell]:
+            self.score -= self.window_score(w)
+            counts[w] += 1
+            self.score += self.window_score(w)
+            if counts[w] == self.game.k:
+                self.won = side
+        self.cells[cell] = side + 1
+        self.marks[side] += 1
+
+    def move(self, cell):
+        """
+        Marks `cell` for the current player.
+        """
+        self.place(cell, self.turn())
+        self.history.append(cell)
+
+    def undo(self):
+        """
+        Takes back the last move.
+        """
+        cell = self.history.pop()
+        side = self.cells[cell] - 1
+        counts = self.counts[side]
+        for w in self.game.cell_windows[cell]:
+            self.score -= self.window_score(w)
+            counts[w] -= 1
+            self.score += self.window_score(w)
+        self.cells[cell] = 0
+        self.marks[side] -= 1
+        self.won = None
+
+    def candidates(self):
+        """
+        Returns the empty cells next to a mark, or the center cell of an
+        empty board, best first by how much the windows through them are
+        worth to either player.
+        """
+        game = self.game
+        cells = self.cells
+        if self.marks == [0, 0]:
+            return [(game.m // 2) * game.n + game.n // 2]
+
+        weights = game.weights
+        x_counts, o_counts = self.counts
+
+        def priority(cell):
+            total = 0
+            for w in game.cell_windows[cell]:
+                x, o = x_counts[w], o_counts[w]
+                if o == 0:
+                    total += weights[x]
+                if x == 0:
+                    total += weights[o]
+            return total
+
+        moves = [
+            cell
+            for cell, mark in enumerate(cells)
+            if mark == 0 and any(cells[near] for near in game.neighbors[cell])
+        ]
+        moves.sort(key=priority, reverse=True)
+        return moves
+
+
+class Search:
+    """
+    Iterative-deepening negamax with alpha-beta pruning from one board,
+    stopped early if the `cancel` event is set.
+    """
+
+    def __init__(self, game, board, cancel=None):
+        self.position = Position(game, board)
+        self.deadline = None
+        self.cancel = cancel
+        self.nodes = 0
+
+        # deepest search best_cell() completed
+        self.depth = 0
+
+    def best_cell(self, budget):
+        """
+        Returns the best cell found by searching one ply deeper at a time
+        until `budget` seconds have passed, the search is cancelled, the
+        search has reached the end of the game, or a forced win has been
+        found.
+        """
+        self.deadline = time.perf_counter() + budget
+        position = self.position
+        moves = position.candidates()
+        best = moves[0]
+        if len(moves) == 1:
+            return best
+        empty = len(position.cells) - position.marks[0] - position.marks[1]
+
+        for depth in range(1, empty + 1):
+            try:
+                value, cell = self.root(moves, depth)
+            except Timeout:
+                break
+            best = cell
+            self.depth = depth
+
+            # search the best move first at the next depth
+            moves.remove(cell)
+            moves.insert(0, cell)
+            if abs(value) >= WIN - empty:
+                break
+        return best
+
+    def root(self, moves, depth):
+        alpha, best = -2 * WIN, None
+        for cell in moves:
+            self.position.move(cell)
+            try:
+                value = -self.negamax(depth - 1, -2 * WIN, -alpha, 1)
+            finally:
+                self.position.undo()
+            if best is None or value > alpha:
+                alpha, best = value, cell
+        return alpha, best
+
+    def negamax(self, depth, alpha, beta, ply):
+        """
+        Returns the value of the position for the player to move, searched
+        `depth` more plies.
+        """
+        self.nodes += 1
+        if time.perf_counter() > self.deadline or (
+            self.cancel is not None and self.cancel.is_set()
+        ):
+            raise Timeout
+
+        position = self.position
+        if position.won is not None:
+            return ply - WIN
+        if position.full():
+            return 0
+        if depth == 0:
+            return -position.score if position.turn() else position.score
+
+        best = -2 * WIN
+        for cell in position.candidates():
+            position.move(cell)
+            try:
+                value = -self.negamax(depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                position.undo()
+            if value > best:
+                best = value
+                if best > alpha:
+                    alpha = best
+                    if alpha >= beta:
+                        break
+        return best
@@ -1,9 +1,27 @@
 import pygame
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
+import mnk
 import tictactoe as ttt
 
+# python runner.py [MxN[-K]] plays the m,n,k game (K defaults to the shorter
+# side) with mnk.py; the default 3x3 game plays perfectly with tictactoe.py
+if len(sys.argv) > 2:
+    sys.exit("Usage: python runner.py [MxN[-K]]")
+if len(sys.argv) == 2:
+    try:
+        shape, _, k = sys.argv[1].partition("-")
+        m, n = map(int, shape.split("x"))
+        game = mnk.Game(m, n, int(k) if k else min(m, n))
+    except ValueError:
+        sys.exit("Usage: python runner.py [MxN[-K]]")
+else:
+    m, n = 3, 3
+    game = ttt
+
 pygame.init()
 size = width, height = 600, 400
 
@@ -15,13 +33,30 @@ screen = pygame.display.set_mode(size)
 
 mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
 largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
-moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
 
+# Board fits between the title and the bottom button
+tile_size = min(80, (height - 140) // m, (width - 40) // n)
+moveFont = pygame.font.Font("OpenSans-Regular.ttf", tile_size * 3 // 4)
+
+# The AI searches in a background thread so the window keeps drawing;
+# `thinking` is the pending search, started at `thinking_since`, and setting
+# `stop` cancels an m,n,k search. A 3x3 search cannot be stopped, but it
+# takes milliseconds and has a worker of its own, so one left running never
+# delays the next
+executor = ThreadPoolExecutor(max_workers=2)
+thinking = None
+thinking_since = 0
+stop = threading.Event()
+
+# The AI waits at least this long before moving, as if thinking
+ai_delay = 0.5
+
+clock = pygame.time.Clock()
 user = None
-board = ttt.initial_state()
-ai_turn = False
+board = game.initial_state()
 
 while True:
+    clock.tick(60)
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
@@ -33,7 +68,8 @@ while True:
     if user is None:
 
         # Draw title
-        title = largeFont.render("Play Tic-Tac-Toe", True, white)
+        title = "Play Tic-Tac-Toe" if game is ttt else f"Play {m},{n},{game.k}"
+        title = largeFont.render(title, True, white)
         titleRect = title.get_rect()
         titleRect.center = ((width / 2), 50)
         screen.blit(title, titleRect)
@@ -67,19 +103,18 @@ while True:
     else:
 
         # Draw game board
-        tile_size = 80
-        tile_origin = (width / 2 - (1.5 * tile_size),
-                       height / 2 - (1.5 * tile_size))
+        tile_origin = (width / 2 - (n / 2 * tile_size),
+                       height / 2 - (m / 2 * tile_size))
         tiles = []
-        for i in range(3):
+        for i in range(m):
             row = []
-            for j in range(3):
+            for j in range(n):
                 rect = pygame.Rect(
                     tile_origin[0] + j * tile_size,
                     tile_origin[1] + i * tile_size,
                     tile_size, tile_size
                 )
-                pygame.draw.rect(screen, white, rect, 3)
+                pygame.draw.rect(screen, white, rect, 3 if tile_size > 30 else 1)
 
                 if board[i][j] != ttt.EMPTY:
                     move = moveFont.render(board[i][j], True, white)
@@ -89,12 +124,12 @@ while True:
                 row.append(rect)
             tiles.append(row)
 
-        game_over = ttt.terminal(board)
-        player = ttt.player(board)
+        game_over = game.terminal(board)
+        player = game.player(board)
 
         # Show title
         if game_over:
-            winner = ttt.winner(board)
+            winner = game.winner(board)
             if winner is None:
                 title = f"Game Over: Tie."
             else:
@@ -102,45 +137,54 @@ while True:
         elif user == player:
             title = f"Play as {user}"
         else:
-            title = f"Computer thinking..."
+            dots = int((time.time() - thinking_since) * 3) % 4
+            title = f"Computer thinking{'.' * dots:<3}"
         title = largeFont.render(title, True, white)
         titleRect = title.get_rect()
         titleRect.center = ((width / 2), 30)
         screen.blit(title, titleRect)
 
-        # Check for AI move
+        # Start the AI's search, and make its move once it is done
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+            if thinking is None:
+                stop = threading.Event()
+                if game is ttt:
+                    thinking = executor.submit(ttt.minimax, board)
+                else:
+                    thinking = executor.submit(game.minimax, board, stop)
+                thinking_since = time.time()
+            elif thinking.done() and time.time() - thinking_since >= ai_delay:
+                board = game.result(board, thinking.result())
+                thinking = None
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
         if click == 1 and user == player and not game_over:
             mouse = pygame.mouse.get_pos()
-            for i in range(3):
-                for j in range(3):
+            for i in range(m):
+                for j in range(n):
                     if (board[i][j] == ttt.EMPTY and tiles[i][j].collidepoint(mouse)):
-                        board = ttt.result(board, (i, j))
-
-        if game_over:
-            againButton = pygame.Rect(width / 3, height - 65, width / 3, 50)
-            again = mediumFont.render("Play Again", True, black)
-            againRect = again.get_rect()
-            againRect.center = againButton.center
-            pygame.draw.rect(screen, white, againButton)
-            screen.blit(again, againRect)
-            click, _, _ = pygame.mouse.get_pressed()
-            if click == 1:
-                mouse = pygame.mouse.get_pos()
-                if againButton.collidepoint(mouse):
-                    time.sleep(0.2)
-                    user = None
-                    board = ttt.initial_state()
-                    ai_turn = False
+                        board = game.result(board, (i, j))
+
+        # Offer a new game, even before this one is over
+        againButton = pygame.Rect(width / 3, height - 65, width / 3, 50)
+        again = mediumFont.render("Play Again" if game_over else "Reset", True, black)
+        againRect = again.get_rect()
+        againRect.center = againButton.center
+        pygame.draw.rect(screen, white, againButton)
+        screen.blit(again, againRect)
+        click, _, _ = pygame.mouse.get_pressed()
+        if click == 1:
+            mouse = pygame.mouse.get_pos()
+            if againButton.collidepoint(mouse):
+                time.sleep(0.2)
+                user = None
+                board = game.initial_state()
+
+                # A search still running is stopped, and its move ignored
+                if thinking is not None:
+                    stop.set()
+                    thinking.cancel()
+                    thinking = None
 
     pygame.display.flip()
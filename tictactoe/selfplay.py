@@ -0,0 +1,224 @@
+"""
+Tic Tac Toe self-play harness
+
+Plays AI-vs-AI and AI-vs-random games headlessly across a pool of worker
+processes, reports throughput and move latency, profiles the game
+functions and checks that minimax() never loses.
+"""
+
+import argparse
+import cProfile
+import functools
+import multiprocessing
+import os
+import pstats
+import random
+import time
+
+import bitboard
+import tictactoe as ttt
+
+OPPONENTS = ["ai", "random"]
+
+# AI-vs-AI games open with this many random moves, so that each seed and
+# game plays a different line
+OPENING_PLIES = 2
+
+# game functions whose cost the profile reports, and the State methods the
+# search calls in their place
+PROFILED = [
+    "player",
+    "actions",
+    "result",
+    "winner",
+    "terminal",
+    "State.move",
+    "State.undo",
+    "State.actions",
+    "State.terminal",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--games", type=int, default=1000, help="games per opponent (default 1000)"
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=None,
+        help="worker processes (default: one per core)",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="seed for the random player"
+    )
+    parser.add_argument(
+        "--profile-games",
+        type=int,
+        default=20,
+        help="games per opponent to profile in this process (default 20)",
+    )
+    parser.add_argument(
+        "--no-book",
+        action="store_true",
+        help="search instead of using the opening book",
+    )
+    parser.add_argument(
+        "--no-table", action="store_true", help="search without the transposition table"
+    )
+    args = parser.parse_args()
+
+    settings = (not args.no_book, not args.no_table)
+    processes = args.processes or os.cpu_count() or 1
+    for opponent in OPPONENTS:
+        report(opponent, run(opponent, args.games, processes, args.seed, settings))
+
+    if args.profile_games:
+        print("Profile")
+        configure(*settings)
+        profile(args.profile_games, args.seed)
+
+
+def configure(use_book, use_table):
+    """
+    Sets the search options of tictactoe.py in this process.
+    """
+    ttt.USE_OPENING_BOOK = use_book
+    ttt.USE_TRANSPOSITION_TABLE = use_table
+
+
+def play_game(arguments):
+    """
+    Plays game number `game` against `opponent` ("ai" or "random") and
+    returns `(winner, ai, expected, latencies, nodes)`: the winner (None
+    for a tie), the side minimax() played (None if it played both), the
+    utility perfect play reaches after a random opening (None against the
+    random player), the seconds each of minimax()'s moves took and the
+    nodes it visited in all.
+
+    Against the random player, minimax() plays X in even games and O in
+    odd ones. Against itself, it plays on from OPENING_PLIES random moves.
+    Every game starts from an empty transposition table, so later games
+    are not answered from the searches of earlier ones.
+    """
+    game, opponent, seed = arguments
+    rng = random.Random(seed * 1_000_003 + game)
+    ai = None if opponent == "ai" else (ttt.X if game % 2 == 0 else ttt.O)
+    ttt.clear_transposition_table()
+
+    board = ttt.initial_state()
+    expected = None
+    if ai is None:
+        for _ in range(OPENING_PLIES):
+            board = ttt.result(board, rng.choice(sorted(ttt.actions(board))))
+        value = bitboard.negamax(bitboard.Bitboard(*bitboard.from_board(board)))
+        expected = value if ttt.player(board) == ttt.X else -value
+
+    latencies, nodes = [], 0
+    while not ttt.terminal(board):
+        if ai is None or ttt.player(board) == ai:
+            ttt.nodes_visited = 0
+            start = time.perf_counter()
+            move = ttt.minimax(board)
+            latencies.append(time.perf_counter() - start)
+            nodes += ttt.nodes_visited
+        else:
+            move = rng.choice(sorted(ttt.actions(board)))
+        board = ttt.result(board, move)
+    return ttt.winner(board), ai, expected, latencies, nodes
+
+
+def run(opponent, games, processes, seed, settings):
+    """
+    Plays `games` games against `opponent` across `processes` worker
+    processes, returning the results of play_game() and the seconds taken.
+    """
+    start = time.perf_counter()
+    with multiprocessing.Pool(
+        processes, initializer=configure, initargs=settings
+    ) as pool:
+        results = pool.map(
+            play_game,
+            [(game, opponent, seed) for game in range(games)],
+            chunksize=max(1, games // (processes * 8)),
+        )
+    return results, time.perf_counter() - start
+
+
+def percentile(values, fraction):
+    """
+    Returns the value `fraction` of the way through the sorted values.
+    """
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def report(opponent, outcome):
+    """
+    Prints the results, throughput and move latency of a run, and raises
+    AssertionError if minimax() lost any game. Against itself, it loses a
+    game if the outcome is not what perfect play from the opening reaches.
+    """
+    results, seconds = outcome
+    latencies = sorted(latency for _, _, _, moves, _ in results for latency in moves)
+    nodes = sum(nodes for _, _, _, _, nodes in results)
+    search_seconds = sum(latencies)
+
+    wins, ties, losses = 0, 0, 0
+    for winner, ai, expected, _, _ in results:
+        utility = 1 if winner == ttt.X else -1 if winner == ttt.O else 0
+        if ai is None and utility != expected:
+            losses += 1
+        elif winner is None:
+            ties += 1
+        elif ai is None or winner == ai:
+            wins += 1
+        else:
+            losses += 1
+
+    print(f"AI vs {opponent}: {len(results)} games in {seconds:.2f}s")
+    print(f"    {wins} wins, {ties} ties, {losses} losses")
+    print(
+        f"    {len(results) / seconds:.1f} games/s,"
+        f" {nodes / search_seconds if search_seconds else 0:.0f} nodes/s"
+    )
+    print(
+        f"    move latency p50 {percentile(latencies, 0.5) * 1000:.3f} ms,"
+        f" p90 {percentile(latencies, 0.9) * 1000:.3f} ms,"
+        f" p99 {percentile(latencies, 0.99) * 1000:.3f} ms,"
+        f" max {latencies[-1] * 1000:.3f} ms"
+    )
+    if losses:
+        raise AssertionError(f"minimax() lost {losses} games against {opponent}")
+
+
+def profile(games, seed):
+    """
+    Plays `games` games against each opponent in this process under
+    cProfile and prints the calls to and time spent in each game function.
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    for opponent in OPPONENTS:
+        for game in range(games):
+            play_game((game, opponent, seed))
+    profiler.disable()
+
+    stats = pstats.Stats(profiler).stats
+    total = max(cumulative for _, _, _, cumulative, _ in stats.values())
+    print(
+        f"    {'function':<14} {'calls':>9} {'own s':>8} {'total s':>8} {'of run':>7}"
+    )
+    for name in PROFILED:
+        code = functools.reduce(getattr, name.split("."), ttt).__code__
+        entry = (code.co_filename, code.co_firstlineno, code.co_name)
+        if entry in stats:
+            _, calls, own, cumulative, _ = stats[entry]
+            print(
+                f"    {name:<14} {calls:>9} {own:>8.3f} {cumulative:>8.3f}"
+                f" {cumulative / total:>7.1%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
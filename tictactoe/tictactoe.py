@@ -2,13 +2,88 @@
 Tic Tac Toe Player
 """
 
+import functools
 import math
+import operator
 from copy import deepcopy
 
+import book
+
 X = "X"
 O = "O"
 EMPTY = None
 
+# search memoizes board values when this is True
+USE_TRANSPOSITION_TABLE = True
+
+# utility of every board searched so far, keyed by `table_key(board)` (or
+# `State.key()` when searching a State); kept across calls so later moves in
+# a game are looked up instead of searched
+transposition_table = {}
+
+# search works on one board and one move per class of boards and moves
+# that are rotations or reflections of each other when this is True
+USE_SYMMETRY = True
+
+# minimax() answers from the opening book (see book.py), when it has been
+# built, before searching
+USE_OPENING_BOOK = True
+
+# minimax() searches with a State that is updated move by move, instead of
+# calling player(), actions(), result() and terminal() on every board, when
+# this is True
+USE_INCREMENTAL_STATE = True
+
+# minimax() runs alpha_beta() instead of a full search when this is True
+USE_ALPHA_BETA = False
+
+# number of boards the search functions have been called on
+nodes_visited = 0
+
+CENTER = (1, 1)
+CORNERS = {(0, 0), (0, 2), (2, 0), (2, 2)}
+LINES = (
+    [[(i, 0), (i, 1), (i, 2)] for i in range(3)]
+    + [[(0, j), (1, j), (2, j)] for j in range(3)]
+    + [[(0, 0), (1, 1), (2, 2)], [(0, 2), (1, 1), (2, 0)]]
+)
+
+# indices into LINES of the lines through each cell
+LINES_THROUGH = {
+    (i, j): [n for n, line in enumerate(LINES) if (i, j) in line]
+    for i in range(3)
+    for j in range(3)
+}
+
+# the 8 rotations and reflections of the board; entry 3 * i + j of each is
+# the cell, numbered the same way, that the symmetry moves onto (i, j)
+SYMMETRIES = [
+    tuple(3 * a + b for a, b in (mapping(i, j) for i in range(3) for j in range(3)))
+    for mapping in (
+        lambda i, j: (i, j),
+        lambda i, j: (2 - j, i),
+        lambda i, j: (2 - i, 2 - j),
+        lambda i, j: (j, 2 - i),
+        lambda i, j: (i, 2 - j),
+        lambda i, j: (2 - i, j),
+        lambda i, j: (j, i),
+        lambda i, j: (2 - j, 2 - i),
+    )
+]
+
+# what each player's mark on each cell adds to the board's key under each
+# entry of SYMMETRIES, reading the board it produces as a base-3 number
+# (empty 0, X 1, O 2) with its first cell most significant; State keeps all
+# 8 keys up to date so that symmetric boards share a key without building
+# any strings
+KEY_INCREMENTS = {
+    player: [
+        tuple(digit * 3 ** (8 - symmetry.index(cell)) for symmetry in SYMMETRIES)
+        for cell in range(9)
+    ]
+    for player, digit in ((X, 1), (O, 2))
+}
+
 
 def initial_state():
     """
@@ -138,11 +213,20 @@ def minimax(board):
     if not (player_turn := player(board)):
         return None
 
+    if USE_OPENING_BOOK and (entry := book.lookup(board)):
+        return entry[0]
+
+    if USE_ALPHA_BETA:
+        return alpha_beta(board)
+
+    if USE_INCREMENTAL_STATE:
+        return minimax_state(board)
+
     if player_turn == X:
         X_best_action = None
         X_best_util = float("-inf")
 
-        for X_action in actions(board):
+        for X_action in search_actions(board):
             board_after_X_action = result(board, X_action)
             O_best_util = min_value(board_after_X_action)
             if O_best_util > X_best_util:
@@ -155,7 +239,7 @@ def minimax(board):
         O_best_action = None
         O_best_util = float("inf")
 
-        for O_action in actions(board):
+        for O_action in search_actions(board):
             board_after_O_action = result(board, O_action)
             X_best_util = max_value(board_after_O_action)
             if X_best_util < O_best_util:
@@ -165,13 +249,119 @@ def minimax(board):
         return O_best_action
 
 
+def encode(board):
+    """
+    Returns a hashable encoding of the board, one entry per cell.
+    """
+    return tuple(cell for row in board for cell in row)
+
+
+def cell_string(board):
+    """
+    Returns the board as a string of nine "X", "O" or "-" characters, one
+    per cell, row by row.
+    """
+    return "".join(cell or "-" for row in board for cell in row)
+
+
+def canonical(board):
+    """
+    Returns `(key, symmetry)`, where `key` is the smallest cell_string() of
+    any rotation or reflection of the board and `symmetry` is the entry of
+    SYMMETRIES that produces it: character k of `key` is cell symmetry[k]
+    of the board.
+    """
+    cells = cell_string(board)
+    return min(
+        ("".join(cells[cell] for cell in symmetry), symmetry) for symmetry in SYMMETRIES
+    )
+
+
+def table_key(board):
+    """
+    Returns the transposition table key of the board, which is shared by
+    all its rotations and reflections if USE_SYMMETRY is set.
+    """
+    return canonical(board)[0] if USE_SYMMETRY else encode(board)
+
+
+def search_actions(board, available=None):
+    """
+    Returns the actions search explores out of `available` (by default
+    actions(board)): all of them, or, if USE_SYMMETRY is set, one from each
+    set of actions that some rotation or reflection leaving the board
+    unchanged maps onto each other.
+    """
+    if available is None:
+        available = actions(board)
+    if not USE_SYMMETRY:
+        return available
+
+    cells = cell_string(board)
+    unchanged = [
+        symmetry
+        for symmetry in SYMMETRIES
+        if all(cells[cell] == cells[k] for k, cell in enumerate(symmetry))
+    ]
+    return representatives(available, unchanged)
+
+
+def representatives(available, unchanged):
+    """
+    Returns one action from each set of actions in `available` that the
+    symmetries in `unchanged`, which leave the board unchanged, map onto
+    each other.
+    """
+    if len(unchanged) == 1:
+        return available
+
+    explored = set()
+    covered = set()
+    for action in sorted(available):
+        if action not in covered:
+            explored.add(action)
+            cell = 3 * action[0] + action[1]
+            covered.update(divmod(symmetry[cell], 3) for symmetry in unchanged)
+    return explored
+
+
+def clear_transposition_table():
+    """
+    Forgets every board value found by previous searches.
+    """
+    transposition_table.clear()
+
+
+def memoized(value_function):
+    """
+    Wraps max_value() or min_value(), or their State versions, to count
+    the nodes they visit and, if USE_TRANSPOSITION_TABLE is set, to look up
+    and store board values.
+    """
+
+    @functools.wraps(value_function)
+    def search(position):
+        global nodes_visited
+        nodes_visited += 1
+        if not USE_TRANSPOSITION_TABLE:
+            return value_function(position)
+
+        key = position.key() if isinstance(position, State) else table_key(position)
+        if key not in transposition_table:
+            transposition_table[key] = value_function(position)
+        return transposition_table[key]
+
+    return search
+
+
+@memoized
 def max_value(board):
     """Helper for minimax()"""
     if terminal(board):
         return utility(board)
 
     X_best_util = float("-inf")
-    for X_action in actions(board):
+    for X_action in search_actions(board):
         board_after_X_action = result(board, X_action)
         O_best_util = min_value(board_after_X_action)
         if O_best_util > X_best_util:
@@ -180,16 +370,279 @@ def max_value(board):
     return X_best_util
 
 
+@memoized
 def min_value(board):
     """Helper for minimax()"""
     if terminal(board):
         return utility(board)
 
     O_best_util = float("inf")
-    for O_action in actions(board):
+    for O_action in search_actions(board):
         board_after_O_action = result(board, O_action)
         X_best_util = max_value(board_after_O_action)
         if X_best_util < O_best_util:
             O_best_util = X_best_util
 
     return O_best_util
+
+
+class State:
+    """
+    A board that search plays moves on and takes them back from in place,
+    along with the number of moves made, the player to move, how many
+    marks each player has in each line and the board's key under each of
+    the SYMMETRIES. Whether a move ends the game is decided from the lines
+    through it alone.
+    """
+
+    def __init__(self, board):
+        self.board = deepcopy(board)
+        self.moves = 0
+        self.counts = {X: [0] * len(LINES), O: [0] * len(LINES)}
+
+        # the keys are only kept if the search will read them
+        self.keys = None
+        if USE_TRANSPOSITION_TABLE or USE_SYMMETRY:
+            self.keys = (0,) * len(SYMMETRIES)
+        for i, row in enumerate(board):
+            for j, cell in enumerate(row):
+                if cell != EMPTY:
+                    self.moves += 1
+                    for line in LINES_THROUGH[(i, j)]:
+                        self.counts[cell][line] += 1
+                    if self.keys is not None:
+                        self.keys = marked(self.keys, 3 * i + j, cell)
+        self.turn = X if self.moves % 2 == 0 else O
+        self.last = None
+        self.winner = winner(board)
+
+        # (move, winner, keys) before each move made, for undo()
+        self.history = []
+
+    def move(self, action):
+        """
+        Makes move (i, j) for the player to move.
+        """
+        i, j = action
+        self.history.append((self.last, self.winner, self.keys))
+        self.board[i][j] = self.turn
+        if self.keys is not None:
+            self.keys = marked(self.keys, 3 * i + j, self.turn)
+        counts = self.counts[self.turn]
+        for line in LINES_THROUGH[action]:
+            counts[line] += 1
+            if counts[line] == 3:
+                self.winner = self.turn
+        self.moves += 1
+        self.last = action
+        self.turn = O if self.turn == X else X
+
+    def undo(self):
+        """
+        Takes back the last move.
+        """
+        i, j = self.last
+        self.turn = O if self.turn == X else X
+        counts = self.counts[self.turn]
+        for line in LINES_THROUGH[self.last]:
+            counts[line] -= 1
+        self.board[i][j] = EMPTY
+        self.moves -= 1
+        self.last, self.winner, self.keys = self.history.pop()
+
+    def terminal(self):
+        return self.winner is not None or self.moves == 9
+
+    def utility(self):
+        return 1 if self.winner == X else -1 if self.winner == O else 0
+
+    def actions(self):
+        return [(i, j) for i in range(3) for j in range(3) if self.board[i][j] == EMPTY]
+
+    def key(self):
+        """
+        Returns the transposition table key of the board, like table_key(),
+        but read off the keys kept up to date by move() and undo().
+        """
+        return min(self.keys) if USE_SYMMETRY else self.keys[0]
+
+    def search_actions(self):
+        """
+        Returns the actions search explores, like search_actions(), finding
+        the symmetries that leave the board unchanged from its keys.
+        """
+        available = self.actions()
+        if not USE_SYMMETRY:
+            return available
+        identity = self.keys[0]
+        return representatives(
+            available,
+            [
+                symmetry
+                for symmetry, key in zip(SYMMETRIES, self.keys)
+                if key == identity
+            ],
+        )
+
+
+def marked(keys, cell, player):
+    """
+    Returns the keys of a board under each of the SYMMETRIES after `player`
+    marks `cell` (3 * i + j), given its keys before.
+    """
+    return tuple(map(operator.add, keys, KEY_INCREMENTS[player][cell]))
+
+
+def minimax_state(board):
+    """
+    Returns the optimal action for the current player, like minimax(), but
+    searching on a State.
+    """
+    state = State(board)
+    X_turn = state.turn == X
+    best_action, best_util = None, None
+    for action in state.search_actions():
+        state.move(action)
+        util = min_value_state(state) if X_turn else max_value_state(state)
+        state.undo()
+        if best_action is None or (util > best_util if X_turn else util < best_util):
+            best_action, best_util = action, util
+    return best_action
+
+
+@memoized
+def max_value_state(state):
+    """Helper for minimax_state()"""
+    if state.terminal():
+        return state.utility()
+
+    X_best_util = -1
+    for X_action in state.search_actions():
+        state.move(X_action)
+        X_best_util = max(X_best_util, min_value_state(state))
+        state.undo()
+
+    return X_best_util
+
+
+@memoized
+def min_value_state(state):
+    """Helper for minimax_state()"""
+    if state.terminal():
+        return state.utility()
+
+    O_best_util = 1
+    for O_action in state.search_actions():
+        state.move(O_action)
+        O_best_util = min(O_best_util, max_value_state(state))
+        state.undo()
+
+    return O_best_util
+
+
+def ordered_actions(board):
+    """
+    Returns the available actions, with moves that win for the current
+    player first, then the center, then the corners, then the edges.
+    """
+    turn = player(board)
+
+    def rank(action):
+        for line in LINES:
+            if action in line and all(
+                board[a][b] == turn for a, b in line if (a, b) != action
+            ):
+                return 0
+        return 1 if action == CENTER else 2 if action in CORNERS else 3
+
+    return sorted(search_actions(board), key=lambda action: (rank(action), action))
+
+
+def alpha_beta(board):
+    """
+    Returns an optimal action for the current player, like minimax(), but
+    searching with alpha-beta pruning, ordered moves and an early exit as
+    soon as a move that forces a win is found.
+    """
+    if not (player_turn := player(board)):
+        return None
+
+    best_action = None
+    if player_turn == X:
+        alpha = -1
+        for action in ordered_actions(board):
+            value = min_value_ab(result(board, action), alpha, 1)
+            if best_action is None or value > alpha:
+                alpha, best_action = value, action
+            if alpha == 1:
+                break
+    else:
+        beta = 1
+        for action in ordered_actions(board):
+            value = max_value_ab(result(board, action), -1, beta)
+            if best_action is None or value < beta:
+                beta, best_action = value, action
+            if beta == -1:
+                break
+    return best_action
+
+
+def bounded(value_function):
+    """
+    Wraps max_value_ab() or min_value_ab() to count the nodes it visits
+    and, if USE_TRANSPOSITION_TABLE is set, to share exact board values
+    with the transposition table. Values outside the (alpha, beta) window
+    are only bounds, so they are stored only if they cannot be anything
+    else (a utility can never be above 1 or below -1).
+    """
+
+    @functools.wraps(value_function)
+    def search(board, alpha, beta):
+        global nodes_visited
+        nodes_visited += 1
+        if not USE_TRANSPOSITION_TABLE:
+            return value_function(board, alpha, beta)
+
+        key = table_key(board)
+        if key in transposition_table:
+            return transposition_table[key]
+        value = value_function(board, alpha, beta)
+        if (alpha < value or value == -1) and (value < beta or value == 1):
+            transposition_table[key] = value
+        return value
+
+    return search
+
+
+@bounded
+def max_value_ab(board, alpha, beta):
+    """Helper for alpha_beta()"""
+    if terminal(board):
+        return utility(board)
+
+    X_best_util = -1
+    for X_action in ordered_actions(board):
+        O_best_util = min_value_ab(result(board, X_action), alpha, beta)
+        X_best_util = max(X_best_util, O_best_util)
+        alpha = max(alpha, X_best_util)
+        if alpha >= beta:
+            break
+
+    return X_best_util
+
+
+@bounded
+def min_value_ab(board, alpha, beta):
+    """Helper for alpha_beta()"""
+    if terminal(board):
+        return utility(board)
+
+    O_best_util = 1
+    for O_action in ordered_actions(board):
+        X_best_util = max_value_ab(result(board, O_action), alpha, beta)
+        O_best_util = min(O_best_util, X_best_util)
+        beta = min(beta, O_best_util)
+        if alpha >= beta:
+            break
+
+    return O_best_util